@@ -0,0 +1,188 @@
+# batch_match.py
+#
+# Headless batch matching: scores many job-seeker profiles against the job index
+# with the same JobMatcher engine as the recommendations page, fanned out over
+# a process pool, and streams ranked matches to a JSONL file. The output file is
+# the checkpoint: rerunning the same command skips profiles already written.
+#
+#   python batch_match.py profiles.jsonl matches.jsonl --top-k 20 --workers 4
+#   python batch_match.py caseload.csv matches.jsonl --llm      # also ask Gemini (needs GEMINI_API_KEY)
+#
+# CSV list columns (disability, skills, work_setup, accommodations) are ";"-separated.
+
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+import ingest
+import job_index
+import job_summaries
+import metrics
+import retrieval
+from matcher import JobMatcher
+from prompt_builder import build_prompt
+from recommendation_parser import parse_response
+
+PROFILE_LIST_FIELDS = ["disability", "skills", "work_setup", "accommodations"]
+PROFILE_TEXT_FIELDS = ["name", "education", "schedule", "preferred_role", "experience_level"]
+MATCH_COLUMNS = ["JobId", "Job Title", "Company Name", "Job Link", "AccessScore", "RelevanceScore",
+                 "SemanticScore"]
+
+
+# --- 1. INPUT / CHECKPOINT ---
+def normalize_profile(raw):
+    profile = dict(raw)
+    for field in PROFILE_LIST_FIELDS:
+        value = profile.get(field) or []
+        if isinstance(value, str):
+            value = [v.strip() for v in value.split(";") if v.strip()]
+        profile[field] = value
+    for field in PROFILE_TEXT_FIELDS:
+        profile[field] = profile.get(field) or ""
+    return profile
+
+
+def read_profiles(path):
+    # Yields (profile_id, profile); id falls back to email, then line number
+    with open(path, newline="", encoding="utf-8") as fh:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(fh)
+        else:
+            rows = (json.loads(line) for line in fh if line.strip())
+        for line_no, raw in enumerate(rows, start=1):
+            profile_id = next((str(raw[k]) for k in ("id", "email") if raw.get(k) not in (None, "")), str(line_no))
+            yield profile_id, normalize_profile(raw)
+
+
+def completed_ids(output_path):
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                done.add(json.loads(line)["profile_id"])
+            except (ValueError, KeyError):
+                continue  # partial line from an interrupted run
+    return done
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as fh:
+        fh.seek(-1, os.SEEK_END)
+        return fh.read(1) == b"\n"
+
+
+def chunked(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+# --- 2. WORKERS ---
+_worker = {}
+
+
+def _init_worker(version, log_queue):
+    # Loaded once per process; artifacts are already built by the parent, which also
+    # writes the workers' metrics events to its log
+    if log_queue is not None:
+        metrics.log_to_queue(log_queue)
+    _worker["matcher"] = JobMatcher.from_index() if version is None else ingest.load_matcher(version)
+
+
+def _match_chunk(chunk, top_k, with_prompt):
+    tops = _worker["matcher"].recommend_many([profile for _, profile in chunk], top_k)
+    records = []
+    for (profile_id, profile), top in zip(chunk, tops):
+        record = {"profile_id": profile_id, "matches": top[MATCH_COLUMNS].to_dict(orient="records")}
+        if with_prompt:
+            record["prompt"] = build_prompt(profile, top, summaries_precomputed=True)[0]
+        records.append(record)
+    return records
+
+
+# --- 3. OPTIONAL LLM PASS ---
+async def _ask_llm(client, records, summaries):
+    responses = await asyncio.gather(*(client.generate(r.pop("prompt")) for r in records), return_exceptions=True)
+    for record, response in zip(records, responses):
+        if isinstance(response, Exception):
+            record["llm_error"] = str(response)
+            continue
+        job_matches = parse_response(response).job_matches
+        for match in job_matches:
+            found = job_summaries.lookup(summaries, match["Job ID"]) if match["Job ID"] else None
+            if found is not None:
+                match["Job Description"], match["Company Info"] = found
+        record["job_matches"] = job_matches
+
+
+# --- 4. DRIVER ---
+def run(input_path, output_path, top_k=20, workers=os.cpu_count(), chunk_size=100, use_llm=False):
+    # Workers send metrics events to this process, the only writer of the log file
+    log_queue = multiprocessing.Queue() if metrics.enable_file_log() else None
+    log_listener = metrics.listen_to_queue(log_queue) if log_queue is not None else None
+
+    # Use the published ingest snapshot if there is one; otherwise build (or refresh)
+    # the shared artifacts once before the workers load them
+    version = ingest.current_version()
+    if version is None:
+        jobs_df = job_index.load_index()
+        retrieval.load_retriever(jobs_df)
+        summaries = job_summaries.load_summaries(jobs_df) if use_llm else None
+    else:
+        summaries = ingest.load_summaries(version) if use_llm else None
+    client = None
+    if use_llm:
+        from llm_client import get_llm_client
+        client = get_llm_client(os.environ["GEMINI_API_KEY"])
+
+    done = completed_ids(output_path)
+    pending = ((pid, p) for pid, p in read_profiles(input_path) if pid not in done)
+    chunks = chunked(pending, chunk_size)
+    written = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version, log_queue)) as pool, \
+            open(output_path, "a", encoding="utf-8") as out:
+        if out.tell() and not _ends_with_newline(output_path):
+            out.write("\n")  # terminate a partial line left by an interrupted run
+        in_flight = set()
+        while True:
+            # Keep a bounded window of chunks in flight so huge inputs stream through
+            for chunk in islice(chunks, max(0, workers * 2 - len(in_flight))):
+                in_flight.add(pool.submit(_match_chunk, chunk, top_k, use_llm))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                records = future.result()
+                if use_llm:
+                    asyncio.run(_ask_llm(client, records, summaries))
+                for record in records:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                # Checkpoint: everything written so far survives an interruption
+                out.flush()
+                os.fsync(out.fileno())
+                written += len(records)
+                print(f"{written} profiles matched ({len(done)} skipped from previous runs)", flush=True)
+    if log_listener is not None:
+        log_listener.stop()
+    return written
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Batch-match job-seeker profiles against the job index.")
+    arg_parser.add_argument("profiles", help="JSONL or CSV file of profiles")
+    arg_parser.add_argument("output", help="JSONL file of ranked matches (appended; doubles as checkpoint)")
+    arg_parser.add_argument("--top-k", type=int, default=20)
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    arg_parser.add_argument("--chunk-size", type=int, default=100)
+    arg_parser.add_argument("--llm", action="store_true", help="Also request Gemini recommendations per profile")
+    args = arg_parser.parse_args()
+
+    run(args.profiles, args.output, args.top_k, args.workers, args.chunk_size, args.llm)
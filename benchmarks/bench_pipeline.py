@@ -0,0 +1,161 @@
+# benchmarks/bench_pipeline.py
+#
+# Per-stage latency, peak memory and throughput of the recommendation pipeline on
+# synthetic data, with a stubbed local LLM. Run from the repository root:
+#
+#   python -m benchmarks.bench_pipeline                          # 1k, 10k, 100k, 1M listings
+#   python -m benchmarks.bench_pipeline --sizes 1000,10000 --profiles 50 --json bench.json
+#
+# Legacy stages (read_excel, row-wise compute_relevance) only run up to --legacy-max
+# rows, since they are the baselines the index/scoring work replaced. Peak MB is what
+# tracemalloc sees (Python allocations); RSS also covers Arrow buffers and touched
+# memory-mapped pages, reported as the resident size after each stage and its growth.
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import job_index
+import reranker
+import retrieval
+from benchmarks.stub_llm import StubLLM
+from benchmarks.synthetic import generate_jobs, generate_profiles
+from keyword_index import KeywordIndex
+from matcher.filters import filter_jobs, rank_jobs, skill_string
+from prompt_builder import build_prompt
+from recommendation_parser import parse_response
+
+
+def legacy_compute_relevance(job_title, job_desc, profile_keywords):
+    # Row-wise scoring as the page originally did it, kept as a baseline
+    text = f"{job_title} {job_desc}".lower()
+    return sum(1 for word in profile_keywords if word in text)
+
+
+def rss_mb():
+    # Current resident set size (Linux); elsewhere the process peak from getrusage
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class StageRecorder:
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.results = []
+
+    def measure(self, size, stage, fn, rows, calls=1):
+        # fn is run once for timing (and RSS) and, if enabled, once more under tracemalloc
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        rss_after = rss_mb()
+
+        peak_mb = None
+        if self.track_memory:
+            tracemalloc.start()
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+
+        self.results.append({
+            "size": size,
+            "stage": stage,
+            "latency_ms": elapsed / calls * 1000,
+            "peak_mb": peak_mb,
+            "rss_mb": rss_after,
+            "rss_delta_mb": rss_after - rss_before,
+            "rows_per_s": rows * calls / elapsed if elapsed else float("inf"),
+        })
+        return result
+
+
+def bench_size(recorder, size, profiles, legacy_max, workdir, learned=None):
+    raw = generate_jobs(size, seed=size)
+
+    if size <= legacy_max:
+        xlsx_path = os.path.join(workdir, f"jobs_{size}.xlsx")
+        raw.to_excel(xlsx_path, index=False)
+        recorder.measure(size, "legacy read_excel", lambda: pd.read_excel(xlsx_path), size)
+
+    jobs = recorder.measure(size, "prepare_index", lambda: job_index.prepare_jobs(raw), size)
+    parquet_path = os.path.join(workdir, f"jobs_{size}.parquet")
+    jobs.to_parquet(parquet_path, index=False)
+    jobs = recorder.measure(size, "load_index", lambda: pd.read_parquet(parquet_path, memory_map=True), size)
+
+    keywords = recorder.measure(size, "keyword_index build", lambda: KeywordIndex.from_jobs(jobs), size)
+    vectors_path = os.path.join(workdir, f"vectors_{size}.npy")
+    meta_path = os.path.join(workdir, f"vectors_{size}_meta.npz")
+    retriever = recorder.measure(size, "retriever build",
+                                 lambda: retrieval.SemanticRetriever.build(jobs, vectors_path, meta_path), size)
+
+    # Per-request stages, averaged over the profile set
+    n = len(profiles)
+    filtered = recorder.measure(size, "filter", lambda: [filter_jobs(jobs, p) for p in profiles], size, n)
+    recorder.measure(
+        size, "relevance (inverted index)",
+        lambda: [keywords.score(skill_string(p).split()) for p in profiles], size, n)
+    if size <= legacy_max:
+        recorder.measure(size, "legacy relevance (apply)", lambda: [
+            jobs.apply(lambda row: legacy_compute_relevance(row["Job Title"], row["Job Description"],
+                                                            skill_string(p).split()), axis=1)
+            for p in profiles], size, n)
+
+    def rank():
+        # The engine's ranking (relevance, semantic similarity and the learned re-ranker, if given)
+        vectors = retriever.embed([retrieval.profile_text(p) for p in profiles])
+        return [rank_jobs(frame, p, keywords, retriever, vectors[i:i + 1], learned).head(20)
+                for i, (frame, p) in enumerate(zip(filtered, profiles))]
+    stage = "rank_jobs (top 20)" if learned is None else "rank_jobs + rerank (top 20)"
+    tops = recorder.measure(size, stage, rank, size, n)
+
+    prompts = recorder.measure(size, "build_prompt", lambda: [
+        build_prompt(p, top, summaries_precomputed=True)[0] for p, top in zip(profiles, tops)], 20, n)
+
+    llm = StubLLM()
+    responses = recorder.measure(size, "llm (stub)", lambda: [llm.generate_sync(pr) for pr in prompts], 20, n)
+    recorder.measure(size, "parse response", lambda: [parse_response(r).job_matches for r in responses], 10, n)
+
+
+def print_table(results):
+    print(f"{'size':>9}  {'stage':<28} {'latency ms':>12} {'peak MB':>9} {'RSS MB':>9} {'ΔRSS MB':>9} {'rows/s':>14}")
+    for r in results:
+        peak = f"{r['peak_mb']:.1f}" if r["peak_mb"] is not None else "-"
+        print(f"{r['size']:>9}  {r['stage']:<28} {r['latency_ms']:>12.2f} {peak:>9} {r['rss_mb']:>9.1f} "
+              f"{r['rss_delta_mb']:>9.1f} {r['rows_per_s']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark the recommendation pipeline on synthetic data.")
+    arg_parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    arg_parser.add_argument("--profiles", type=int, default=20)
+    arg_parser.add_argument("--legacy-max", type=int, default=10000)
+    arg_parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass (faster)")
+    arg_parser.add_argument("--json", help="Also write results to this JSON file")
+    arg_parser.add_argument("--reranker", default=reranker.RERANKER_PATH,
+                            help="Learned re-ranker to include in ranking, if the file exists")
+    args = arg_parser.parse_args()
+
+    recorder = StageRecorder(track_memory=not args.no_memory)
+    profiles = generate_profiles(args.profiles, seed=1)
+    learned = reranker.load_reranker(args.reranker)
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in [int(s) for s in args.sizes.split(",")]:
+            bench_size(recorder, size, profiles, args.legacy_max, workdir, learned)
+            print_table([r for r in recorder.results if r["size"] == size])
+            print()
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(recorder.results, fh, indent=2)
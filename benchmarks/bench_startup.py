@@ -0,0 +1,113 @@
+# benchmarks/bench_startup.py
+#
+# Cold-start report: import cost of each page's entry path and of the main modules,
+# measured in fresh interpreters with `python -X importtime`. Run from the repository root:
+#
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --targets langchain_utils,job_store --top 15 --json startup.json
+#
+# "gate" targets are what a page imports before its st.stop() precondition checks, i.e.
+# the cost of a first page view without a profile.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Target name -> modules imported together in one fresh interpreter
+TARGETS = {
+    "page 1 (profile form)": ["streamlit", "job_store"],
+    "page 2 gate": ["streamlit", "uuid", "metrics"],
+    "page 2 full": ["streamlit", "uuid", "metrics", "llm_client", "langchain_utils", "tts_worker", "matcher",
+                    "llm_cache", "recommendation_parser", "prompt_builder", "job_summaries", "inclusivity_scores", "ingest",
+                    "job_store", "reranker", "feedback_store"],
+    "page 3 gate": ["streamlit"],
+    "page 3 full": ["streamlit", "pdf_render", "resume_builder", "task_queue"],
+    "langchain_utils": ["langchain_utils"],
+    "langchain parsers (first use)": ["langchain_utils"],
+    "job_store": ["job_store"],
+    "pdf_render": ["pdf_render"],
+    "resume_builder": ["resume_builder"],
+    "matcher": ["matcher"],
+}
+# Extra code run after the imports (first use of lazily built objects)
+FIRST_USE = {
+    "langchain parsers (first use)": "langchain_utils.get_recommendation_output_spec(); "
+                                     "langchain_utils.get_structured_prompt('x')",
+}
+
+CHILD = """
+import time
+start = time.perf_counter()
+import {modules}
+{first_use}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def parse_importtime(stderr):
+    # (cumulative us, self us, module) for every line of -X importtime output
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()[1:]))  # drop the separator space
+    return rows
+
+
+def measure(name, modules, repeats, top):
+    code = CHILD.format(modules=", ".join(modules), first_use=FIRST_USE.get(name, ""))
+    timings, rows = [], []
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, cwd=os.getcwd())
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+            return {"target": name, "modules": modules, "error": error}
+        timings.append(float(proc.stdout.strip().splitlines()[-1]))
+        rows = parse_importtime(proc.stderr)
+    # Heaviest packages pulled in by the targets: skip interpreter startup (everything up
+    # to "site"), count root packages at any nesting depth, leave out the targets themselves
+    startup_end = next((i for i, (_, _, mod) in enumerate(rows) if mod == "site"), -1)
+    packages = {}
+    for cum, _, mod in rows[startup_end + 1:]:
+        mod = mod.strip()
+        if "." not in mod and mod not in modules:
+            packages[mod] = max(cum, packages.get(mod, 0))
+    heaviest = sorted(((cum, mod) for mod, cum in packages.items()), reverse=True)[:top]
+    return {
+        "target": name,
+        "modules": modules,
+        "import_ms": min(timings),
+        "modules_loaded": len(rows),
+        "heaviest": [{"module": mod, "cumulative_ms": cum / 1000} for cum, mod in heaviest],
+    }
+
+
+def print_report(results):
+    print(f"{'target':<32} {'import ms':>10} {'modules':>8}  heaviest packages")
+    for r in results:
+        if "error" in r:
+            print(f"{r['target']:<32} {'-':>10} {'-':>8}  {r['error']}")
+            continue
+        heaviest = ", ".join(f"{h['module']} {h['cumulative_ms']:.0f}ms" for h in r["heaviest"])
+        print(f"{r['target']:<32} {r['import_ms']:>10.1f} {r['modules_loaded']:>8}  {heaviest}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Report cold-start import times (python -X importtime).")
+    arg_parser.add_argument("--targets", help=f"Comma-separated subset of: {', '.join(TARGETS)}")
+    arg_parser.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per target (min is reported)")
+    arg_parser.add_argument("--top", type=int, default=5, help="Heaviest imported packages to list")
+    arg_parser.add_argument("--json", help="Also write results to this JSON file")
+    args = arg_parser.parse_args()
+
+    names = args.targets.split(",") if args.targets else list(TARGETS)
+    results = [measure(name, TARGETS[name], args.repeats, args.top) for name in names]
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
@@ -0,0 +1,55 @@
+# benchmarks/stub_llm.py
+#
+# Local stand-in for the Gemini gateway (same generate_sync / stream_sync / generate
+# surface as llm_client.LLMClient). It answers recommendation prompts with
+# well-formed job cards for the listed Job IDs, and inclusivity scoring prompts with a
+# reason/score JSON block, after an optional simulated delay.
+
+import asyncio
+import re
+import time
+
+INCLUSIVITY_MARKER = "provide a numeric score"
+INCLUSIVE_TERMS = ["accommodation", "accessible", "remote", "flexible", "assistive", "screen reader",
+                   "caption", "interpreter", "inclusion", "equal opportunity", "no degree", "training"]
+LISTING_PATTERN = re.compile(r"Job ID: (\w+)\nJob Title: (.*)\nCompany: (.*)\n(?:.*\n)*?Link: \[Apply here\]\((.*)\)")
+
+
+class StubLLM:
+    def __init__(self, latency=0.0, matches=10, chunk_chars=80):
+        self.latency = latency
+        self.matches = matches
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+
+    def respond(self, prompt):
+        if INCLUSIVITY_MARKER in prompt:
+            return self.score(prompt)
+        cards = [
+            f"### 📌 {title} at {company}\n\n**Job ID:** {job_id}\n\n"
+            f"**Why this is a good fit:** Matches the listed skills and offers the needed accommodations.\n\n"
+            f"**Application Link:** [Apply here]({link})\n\n---\n\n"
+            for job_id, title, company, link in LISTING_PATTERN.findall(prompt)[:self.matches]
+        ]
+        return "".join(cards) + "💬 Interview Advice Card\n\n- Ask about accommodations early.\n"
+
+    def score(self, prompt):
+        # Deterministic 1-10 score from the inclusive terms the listing mentions
+        found = [term for term in INCLUSIVE_TERMS if term in prompt.lower()]
+        reason = f"Mentions {', '.join(found)}." if found else "No accommodations or inclusive language mentioned."
+        return f'```json\n{{"reason": "{reason}", "score": "{min(1 + len(found), 10)}"}}\n```'
+
+    def generate_sync(self, prompt, model_name=None, generation_config=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.respond(prompt)
+
+    async def generate(self, prompt, model_name=None, generation_config=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.respond(prompt)
+
+    def stream_sync(self, prompt, model_name=None, generation_config=None):
+        text = self.generate_sync(prompt)
+        for start in range(0, len(text), self.chunk_chars):
+            yield text[start:start + self.chunk_chars]
@@ -0,0 +1,117 @@
+# benchmarks/synthetic.py
+#
+# Synthetic job listings (same schema as accessible_jobs_chicago_cursor.xlsx) and
+# job-seeker profiles (same shape as pages/1_User_Profile.py saves) for benchmarks.
+
+import numpy as np
+import pandas as pd
+
+ROLES = [
+    "Software Engineer", "Junior Developer", "QA Tester", "Data Entry Clerk", "Data Analyst",
+    "Cashier", "Grocery Associate", "Retail Sales Associate", "Customer Support Specialist",
+    "Chat Support Agent", "Accessibility Tester", "Warehouse Associate", "Medical Receptionist",
+    "Healthcare IT Technician", "Project Coordinator", "Administrative Assistant",
+]
+SENIORITY = ["", "", "", "", "Senior ", "Lead ", "Associate ", "Manager, "]
+COMPANIES = ["Acme", "Northwind", "Lakeshore", "Midway", "Prairie", "Riverbend", "Loop", "Harbor", "Summit", "Beacon"]
+SUFFIXES = ["Health", "Foods", "Tech", "Retail", "Logistics", "Bank", "Labs", "Group"]
+
+DESCRIPTION_SENTENCES = [
+    "You will work with Python and SQL to maintain internal tools.",
+    "Handle cash, operate the POS system and greet customers.",
+    "Answer customer questions over chat and email with empathy.",
+    "Test web applications with screen reader software such as JAWS and NVDA.",
+    "Enter and verify data in Excel spreadsheets with high accuracy.",
+    "This role is fully remote and offers flexible hours.",
+    "Hybrid schedule with two days per week in our Chicago office.",
+    "Our office is wheelchair accessible and we provide ergonomic equipment.",
+    "We offer ASL interpreters and live captioning for all meetings.",
+    "A bachelor's degree in computer science or a related field is required.",
+    "A master's degree is preferred but not required.",
+    "No degree required; we provide paid on-the-job training.",
+    "3+ years of experience in a similar role.",
+    "Entry-level candidates are encouraged to apply.",
+    "Collaborate with a supportive team on project management tasks.",
+    "Lift up to 50 pounds and stand for extended periods.",
+    "We are an equal opportunity employer committed to disability inclusion.",
+    "Assistive technology and reasonable accommodations are available on request.",
+]
+
+DISABILITIES = [
+    "Physical Disability (e.g., wheelchair user, limb impairment)",
+    "Vision Impairment (e.g., low vision, blindness)",
+    "Hearing Impairment (e.g., hard of hearing, deaf)",
+    "Cognitive or Learning Disability (e.g., dyslexia, ADHD)",
+    "Mental Health Condition (e.g., anxiety, depression)",
+    "Chronic Illness (e.g., arthritis, multiple sclerosis)",
+    "Neurodivergent (e.g., autism spectrum, Asperger’s)",
+]
+ACCOMMODATIONS = [
+    "Wheelchair-accessible workspace", "Screen reader-friendly environment",
+    "Sign language interpreter or captioning", "Flexible work hours", "Remote work options",
+    "Ergonomic equipment", "Assistive technology (e.g., speech-to-text software)",
+]
+EDUCATION = ["No formal education", "High School Diploma or GED", "Associate’s Degree",
+             "Bachelor’s Degree", "Master’s Degree or Higher", "Vocational Training/Certification"]
+SKILLS = ['Python', 'Java', 'SQL', 'Machine Learning', 'Data Analysis', 'Excel', 'Cloud Computing',
+          'Communication', 'Teamwork', 'Problem-Solving', 'Adaptability', 'Critical Thinking',
+          'Customer Service', 'Project Management', 'Sales', 'Healthcare IT', 'Retail']
+WORK_SETUP = ["Fully remote (Work from home)", "Hybrid (Mix of remote & in-office)", "In-office", "Open to any"]
+SCHEDULES = ["Full-time (40+ hours/week)", "Part-time (Less than 30 hours/week)",
+             "Freelance / Contract", "Internship / Apprenticeship"]
+EXPERIENCE = ["0–1 years", "1–3 years", "3–5 years", "5–7 years", "7+ years"]
+PREFERRED_ROLES = ["", "Software Engineer", "Data Analyst", "Cashier", "Customer Service", "QA Tester"]
+
+
+def _pick(rng, options, n):
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), n)]
+
+
+def generate_jobs(n, seed=0, sentences_per_job=6):
+    rng = np.random.default_rng(seed)
+    titles = pd.Series(_pick(rng, SENIORITY, n)) + pd.Series(_pick(rng, ROLES, n))
+    companies = pd.Series(_pick(rng, COMPANIES, n)) + " " + pd.Series(_pick(rng, SUFFIXES, n))
+    company_ids = pd.Series(rng.integers(0, max(n // 5, 1), n)).astype(str)
+    company_names = companies + " " + company_ids
+
+    descriptions = pd.Series(_pick(rng, DESCRIPTION_SENTENCES, n))
+    for _ in range(sentences_per_job - 1):
+        descriptions = descriptions + " " + pd.Series(_pick(rng, DESCRIPTION_SENTENCES, n))
+
+    return pd.DataFrame({
+        "Job Title": titles,
+        "Job Description": descriptions,
+        "Company Info": company_names + " is a Chicago employer in " + pd.Series(_pick(rng, SUFFIXES, n)).str.lower()
+                        + ". We value an inclusive workplace.",
+        "Company Name": company_names,
+        "Job Link": "https://jobs.example.com/" + pd.Series(np.arange(n)).astype(str),
+    })
+
+
+def _sample(rng, options, low, high):
+    return [str(o) for o in rng.choice(options, size=rng.integers(low, high), replace=False)]
+
+
+def generate_profiles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    profiles = []
+    for i in range(n):
+        profiles.append({
+            "name": f"Candidate {i}",
+            "email": f"candidate{i}@example.com",
+            "phone": "",
+            "disability": _sample(rng, DISABILITIES, 1, 3),
+            "other_disability": "",
+            "accommodations": _sample(rng, ACCOMMODATIONS, 0, 3),
+            "education": str(rng.choice(EDUCATION)),
+            "skills": _sample(rng, SKILLS, 1, 5),
+            "custom_skills": "",
+            "work_setup": _sample(rng, WORK_SETUP, 1, 3),
+            "schedule": str(rng.choice(SCHEDULES)),
+            "experience_level": str(rng.choice(EXPERIENCE)),
+            "preferred_role": str(rng.choice(PREFERRED_ROLES)),
+            "want_resume": "Yes",
+            "want_recommendations": "Yes",
+            "tts": False,
+        })
+    return profiles
@@ -0,0 +1,126 @@
+# feedback_store.py
+#
+# Append-only log of recommendation feedback (👍 / 👎 / Maybe) and "applied" clicks,
+# keyed by the stable JobId and a hash of the profile's matching features (no names
+# or contact details are stored). Events are buffered in memory and written in one
+# SQLite transaction per flush; reranker.py trains on them offline.
+#
+#   events = FeedbackLog()
+#   events.record(profile, job_row, "helpful", position=3, session_id=...)
+#   events.flush()      # e.g. once at the end of a Streamlit script run
+
+import atexit
+import contextlib
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+import pandas as pd
+
+FEEDBACK_DB_PATH = "feedback_events.sqlite3"
+
+HELPFUL, NOT_HELPFUL, MAYBE, APPLIED = "helpful", "not_helpful", "maybe", "applied"
+EVENT_TYPES = (HELPFUL, NOT_HELPFUL, MAYBE, APPLIED)
+
+# Profile fields that shape matching (same idea as llm_cache.PROFILE_KEY_FIELDS, minus the name)
+PROFILE_FEATURE_FIELDS = ["disability", "education", "skills", "work_setup", "accommodations", "schedule",
+                          "preferred_role", "experience_level"]
+
+
+# --- 1. PROFILE FEATURES ---
+def profile_tokens(profile):
+    # "field=value" tokens, lowercased; list fields give one token per entry
+    tokens = set()
+    for field in PROFILE_FEATURE_FIELDS:
+        value = profile.get(field) or []
+        for item in value if isinstance(value, (list, tuple, set)) else [value]:
+            item = " ".join(str(item).split()).casefold()
+            if item:
+                tokens.add(f"{field}={item}")
+    return sorted(tokens)
+
+
+def profile_features(profile):
+    # Stable 32-bit hashes of the profile tokens (what events and the re-ranker see)
+    return [zlib.crc32(token.encode("utf-8")) for token in profile_tokens(profile)]
+
+
+def profile_hash(profile):
+    return hashlib.sha1(json.dumps(profile_features(profile)).encode("utf-8")).hexdigest()[:16]
+
+
+# --- 2. EVENT LOG ---
+class FeedbackLog:
+    def __init__(self, path=FEEDBACK_DB_PATH, batch_size=100):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    session_id TEXT,
+                    profile_hash TEXT NOT NULL,
+                    profile_features TEXT NOT NULL,
+                    job_id TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    position INTEGER,
+                    job_groups INTEGER NOT NULL,
+                    features TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_profile_job ON events (profile_hash, job_id)")
+        atexit.register(self.flush)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, profile, job_row, event, position=None, session_id=None):
+        # job_row: the ranked candidate (a row of JobMatcher.recommend); its ranking features
+        # are stored with the event so training doesn't depend on the listing still existing
+        import reranker
+
+        if event not in EVENT_TYPES:
+            raise ValueError(f"Unknown feedback event {event!r}")
+        row = pd.DataFrame([job_row])
+        features = profile_features(profile)
+        entry = (time.time(), session_id, profile_hash(profile), json.dumps(features), str(job_row["JobId"]),
+                 event, position, int(reranker.job_groups(row)[0]),
+                 json.dumps([round(float(v), 6) for v in reranker.dense_features(row)[0]]))
+        with self._lock:
+            self._pending.append(entry)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO events (created_at, session_id, profile_hash, profile_features, job_id, event, "
+                "position, job_groups, features) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", pending)
+        return len(pending)
+
+    def events(self):
+        # Every stored event as a DataFrame, oldest first
+        with self._connect() as conn:
+            return pd.read_sql_query("SELECT * FROM events ORDER BY id", conn)
+
+    def stats(self):
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT event, COUNT(*) FROM events GROUP BY event").fetchall())
+        return {event: counts.get(event, 0) for event in EVENT_TYPES}
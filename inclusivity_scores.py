@@ -0,0 +1,166 @@
+# inclusivity_scores.py
+#
+# Offline inclusivity rating of every listing with the structured reason/score prompt
+# from langchain_utils. Listings are sent to the LLM gateway concurrently in bounded
+# batches; results are stored keyed by JobId + description hash, so a rerun only
+# scores new or edited listings. Scores are joined onto the job index when a matcher
+# loads, so recommendations can sort and filter by them at no request-time cost.
+#
+#   python inclusivity_scores.py                   # score the current snapshot / job index (needs GEMINI_API_KEY)
+#   python inclusivity_scores.py --stub --limit 200  # local stub model, no API calls
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+SCORES_PATH = "inclusivity_scores.parquet"
+SCORE_COLUMNS = ["InclusivityScore", "InclusivityReason"]
+
+MODEL_NAME = "models/gemini-1.5-flash-latest"
+GENERATION_CONFIG = {"temperature": 0.2, "max_output_tokens": 256}
+MAX_DESCRIPTION_CHARS = 4000      # keeps each scoring prompt small
+SCORE_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+# --- 1. KEYS ---
+def description_hashes(descriptions):
+    return [hashlib.sha1(text.encode("utf-8")).hexdigest()[:16] for text in descriptions]
+
+
+def parse_score(value):
+    # "8", "8/10", "Score: 7.5" -> float in [1, 10]; None if there is no number
+    found = SCORE_PATTERN.search(str(value))
+    return min(max(float(found.group()), 1.0), 10.0) if found else None
+
+
+# --- 2. SCORING ---
+def _job_text(title, description):
+    return f"{title}\n\n{description[:MAX_DESCRIPTION_CHARS]}"
+
+
+async def _score_batch(client, texts, prompt, parse):
+    responses = await asyncio.gather(
+        *(client.generate(prompt(text), MODEL_NAME, GENERATION_CONFIG) for text in texts), return_exceptions=True)
+    results = []
+    for response in responses:
+        try:
+            if isinstance(response, Exception):
+                raise response
+            parsed = parse(response)
+            score = parse_score(parsed.get("score"))
+            if score is None:
+                raise ValueError(f"no numeric score in {parsed.get('score')!r}")
+            results.append((score, str(parsed.get("reason", "")).strip(), None))
+        except Exception as e:
+            results.append((np.nan, "", str(e)))
+    return results
+
+
+def score_jobs(jobs_df, client, existing=None, dest=SCORES_PATH, batch_size=32, prompt=None, parse=None):
+    # Scores the listings that have no stored score for their current description and
+    # returns (full table with a JobId index, error messages). Each finished batch is
+    # checkpointed to dest; failed listings stay unscored and are retried next run.
+    if prompt is None or parse is None:
+        import langchain_utils
+        prompt = prompt or langchain_utils.get_structured_prompt
+        parse = parse or langchain_utils.parse_structured_response
+
+    jobs = pd.DataFrame({"JobId": jobs_df["JobId"].to_numpy(),
+                         "DescriptionHash": description_hashes(jobs_df["Job Description"]),
+                         "Text": [_job_text(t, d) for t, d in zip(jobs_df["Job Title"], jobs_df["Job Description"])]})
+    jobs = jobs.drop_duplicates("JobId")
+    if existing is None:
+        existing = load_scores(dest)
+    existing = existing.reset_index()
+    todo = jobs[~(jobs["JobId"] + jobs["DescriptionHash"]).isin(existing["JobId"] + existing["DescriptionHash"])]
+    # Stored scores of listings outside jobs_df (e.g. a --limit run) are kept as they are
+    kept = existing[~existing["JobId"].isin(todo["JobId"])]
+
+    scored, errors = [kept], []
+    for start in range(0, len(todo), batch_size):
+        batch = todo.iloc[start:start + batch_size]
+        with metrics.span("inclusivity_batch"):
+            results = asyncio.run(_score_batch(client, batch["Text"].tolist(), prompt, parse))
+        scores, reasons, failures = zip(*results)
+        ok = np.array([f is None for f in failures])
+        errors += [f for f in failures if f is not None]
+        scored.append(pd.DataFrame({"JobId": batch["JobId"].to_numpy()[ok],
+                                    "DescriptionHash": batch["DescriptionHash"].to_numpy()[ok],
+                                    "InclusivityScore": np.asarray(scores, dtype=float)[ok],
+                                    "InclusivityReason": np.asarray(reasons, dtype=object)[ok],
+                                    "ScoredAt": time.time()}))
+        metrics.increment("inclusivity_scored_total", int(ok.sum()))
+        metrics.increment("inclusivity_errors_total", int((~ok).sum()))
+        _store(pd.concat(scored, ignore_index=True), dest)
+        print(f"{start + len(batch)}/{len(todo)} listings scored ({len(errors)} failed)", flush=True)
+
+    table = pd.concat(scored, ignore_index=True)
+    _store(table, dest)
+    return table.set_index("JobId"), errors
+
+
+def _store(table, dest):
+    tmp = f"{dest}.tmp"
+    table.to_parquet(tmp, index=False)
+    os.replace(tmp, dest)
+
+
+# --- 3. LOAD / JOIN ---
+def load_scores(path=SCORES_PATH):
+    if not os.path.exists(path):
+        return pd.DataFrame({"JobId": pd.Series(dtype=object), "DescriptionHash": pd.Series(dtype=object),
+                             "InclusivityScore": pd.Series(dtype=float), "InclusivityReason": pd.Series(dtype=object),
+                             "ScoredAt": pd.Series(dtype=float)}).set_index("JobId")
+    return pd.read_parquet(path).set_index("JobId")
+
+
+def scores_version(path=SCORES_PATH):
+    # Changes whenever the score table is rewritten (used as a cache key)
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def attach_scores(jobs_df, path=SCORES_PATH):
+    # InclusivityScore / InclusivityReason columns (NaN / "" where a listing has no
+    # score for its current description)
+    scores = load_scores(path)
+    jobs_df = jobs_df.drop(columns=[c for c in SCORE_COLUMNS if c in jobs_df.columns])
+    if scores.empty:
+        return jobs_df.assign(InclusivityScore=np.nan, InclusivityReason="")
+    aligned = scores.reindex(jobs_df["JobId"])
+    current = aligned["DescriptionHash"].to_numpy() == np.asarray(description_hashes(jobs_df["Job Description"]))
+    return jobs_df.assign(InclusivityScore=np.where(current, aligned["InclusivityScore"].to_numpy(dtype=float), np.nan),
+                          InclusivityReason=np.where(current, aligned["InclusivityReason"].fillna("").to_numpy(), ""))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Score listings for inclusivity with the LLM (incremental).")
+    arg_parser.add_argument("--dest", default=SCORES_PATH)
+    arg_parser.add_argument("--batch-size", type=int, default=32, help="Listings per concurrent batch")
+    arg_parser.add_argument("--limit", type=int, help="Only the first N listings (for trial runs)")
+    arg_parser.add_argument("--stub", action="store_true", help="Use the local stub model (no API calls)")
+    args = arg_parser.parse_args()
+
+    import ingest
+    import job_index
+
+    version = ingest.current_version()
+    source = ingest.load_snapshot(version)[0] if version else job_index.load_index()
+    if args.limit:
+        source = source.head(args.limit)
+    if args.stub:
+        from benchmarks.stub_llm import StubLLM
+        llm = StubLLM()
+    else:
+        from llm_client import get_llm_client
+        llm = get_llm_client(os.environ["GEMINI_API_KEY"])
+
+    table, failed = score_jobs(source, llm, dest=args.dest, batch_size=args.batch_size)
+    print(f"{len(table)} listings scored -> {args.dest} ({len(failed)} failed, retried on the next run)")
@@ -0,0 +1,243 @@
+# ingest.py
+#
+# Incremental ingestion of job listings. Append/update batches (CSV or JSONL with
+# the spreadsheet's columns) are merged into the current dataset, deduplicated on
+# JobId (Job Title + Company Name, ignoring case and surrounding whitespace; a later
+# batch updates an existing listing), and only the changed rows are re-tokenized,
+# re-embedded and re-summarized. Each result is written as an immutable, versioned
+# snapshot directory and published by atomically replacing the CURRENT pointer, which
+# running app workers pick up on their next rerun.
+#
+#   python ingest.py init                       # first snapshot from the job spreadsheet
+#   python ingest.py add new_jobs.csv more.jsonl
+#   python ingest.py watch --interval 5         # ingest drops in incoming/ as they arrive
+#   python ingest.py rebuild                    # full rebuild of the current data (fresh vocabulary)
+#
+# Only one ingester should run at a time; readers never see a partial snapshot.
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+import job_index
+import job_summaries
+import retrieval
+import snapshots
+from keyword_index import KeywordIndex
+
+SNAPSHOT_ROOT = "snapshots"
+INCOMING_DIR = "incoming"
+BATCH_PATTERNS = ("*.csv", "*.jsonl")
+
+INDEX_FILE = "job_index.parquet"
+KEYWORDS_FILE = "keyword_index.npz"
+VECTORS_FILE = "job_vectors.npy"
+META_FILE = "job_vectors_meta.npz"
+SUMMARIES_FILE = "job_summaries.parquet"
+
+
+# --- 1. SNAPSHOTS ---
+def snapshot_dir(version, root=SNAPSHOT_ROOT):
+    return snapshots.snapshot_dir(version, root)
+
+
+def current_version(root=SNAPSHOT_ROOT):
+    return snapshots.current_version(root)
+
+
+# --- 2. ARTIFACTS (one directory per snapshot; also the shard format in job_store.py) ---
+def write_artifacts(jobs_df, path, model=None):
+    # Full build of every derived index into path. With a fitted retriever model the job
+    # vectors share its vocabulary, so semantic scores are comparable across directories.
+    jobs_df.to_parquet(os.path.join(path, INDEX_FILE), index=False)
+    KeywordIndex.from_jobs(jobs_df).save(os.path.join(path, KEYWORDS_FILE))
+    vectors_path, meta_path = os.path.join(path, VECTORS_FILE), os.path.join(path, META_FILE)
+    if model is None:
+        retrieval.SemanticRetriever.build(jobs_df, vectors_path, meta_path)
+    else:
+        model.updated(jobs_df, np.arange(len(jobs_df)), vectors_path, meta_path)
+    job_summaries.build_summaries(jobs_df, os.path.join(path, SUMMARIES_FILE))
+
+
+def load_artifacts(path):
+    # (jobs, keyword index, retriever, summaries), memory-mapped where possible
+    jobs_df = pd.read_parquet(os.path.join(path, INDEX_FILE), memory_map=True)
+    keywords = KeywordIndex.load(os.path.join(path, KEYWORDS_FILE))
+    retriever = retrieval.SemanticRetriever.load(os.path.join(path, VECTORS_FILE), os.path.join(path, META_FILE))
+    return jobs_df, keywords, retriever, load_artifact_summaries(path)
+
+
+def load_artifact_summaries(path):
+    return pd.read_parquet(os.path.join(path, SUMMARIES_FILE)).set_index("JobId")
+
+
+def artifacts_matcher(path):
+    from matcher import JobMatcher
+
+    jobs_df, keywords, retriever, _ = load_artifacts(path)
+    return JobMatcher(jobs_df, retriever=retriever, keyword_index=keywords)
+
+
+def load_snapshot(version, root=SNAPSHOT_ROOT):
+    return load_artifacts(snapshot_dir(version, root))
+
+
+def load_summaries(version, root=SNAPSHOT_ROOT):
+    return load_artifact_summaries(snapshot_dir(version, root))
+
+
+def load_matcher(version, root=SNAPSHOT_ROOT):
+    return artifacts_matcher(snapshot_dir(version, root))
+
+
+# --- 3. MERGE ---
+def read_batch(path):
+    if path.endswith(".jsonl"):
+        return pd.read_json(path, lines=True, dtype=False)
+    return pd.read_csv(path)
+
+
+def merge_jobs(jobs_df, batch_df):
+    # (merged jobs, changed positions, added, updated). Existing rows keep their
+    # positions; listings whose text changed are updated in place, new ones appended.
+    # Both sides are deduplicated on JobId first: within the batch the last row of a listing
+    # is its latest update, and snapshots written before JobId dedup may repeat one (the
+    # first is kept). Rows after the first dropped duplicate move up, so they are re-derived
+    # as changed.
+    batch = job_index.prepare_jobs(batch_df, keep="last")
+    jobs_df = jobs_df.reset_index(drop=True)
+    dropped = jobs_df["JobId"].duplicated().to_numpy()
+    shifted = np.arange(np.argmax(dropped), (~dropped).sum()) if dropped.any() else np.empty(0, dtype=np.int64)
+    jobs_df = jobs_df[~dropped].reset_index(drop=True)
+    position = pd.Series(np.arange(len(jobs_df)), index=jobs_df["JobId"])
+    existing = batch["JobId"].isin(position.index).to_numpy()
+
+    merged = pd.concat([jobs_df, batch[~existing]], ignore_index=True)
+    for col in job_index.TEXT_COLUMNS:
+        if col in merged.columns:
+            merged[col] = merged[col].fillna("")
+
+    updates = batch[existing]
+    targets = position.loc[updates["JobId"]].to_numpy()
+    columns = [col for col in batch.columns if col in merged.columns]
+    differs = np.zeros(len(updates), dtype=bool)
+    for col in job_index.TEXT_COLUMNS:
+        if col in batch.columns:
+            differs |= merged[col].to_numpy()[targets] != updates[col].to_numpy()
+    targets = targets[differs]
+    for col in columns:
+        merged.loc[targets, col] = updates[col].to_numpy()[differs]
+
+    appended = np.arange(len(jobs_df), len(merged))
+    changed = np.union1d(np.union1d(targets, shifted), appended)
+    return merged, changed, len(appended), len(targets)
+
+
+# --- 4. INGEST ---
+def _write_snapshot(root, jobs_df, build, manifest):
+    # build(tmp_dir) writes the derived artifacts; the directory is renamed into place when complete
+    os.makedirs(root, exist_ok=True)
+    version = snapshots.next_version(root)
+    tmp = os.path.join(root, f".{version}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    build(tmp)
+    manifest = {"version": version, "dataset_version": job_index.dataset_version(jobs_df),
+                "jobs": len(jobs_df), "created_at": time.time(), **manifest}
+    with open(os.path.join(tmp, snapshots.MANIFEST_FILE), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    os.rename(tmp, snapshot_dir(version, root))
+    snapshots.publish(version, root)
+    snapshots.prune(root)
+    return manifest
+
+
+def build_snapshot(jobs_df, root=SNAPSHOT_ROOT, sources=()):
+    # Full build of every derived index
+    jobs_df = job_index.refresh_access_tags(jobs_df.reset_index(drop=True))
+
+    return _write_snapshot(root, jobs_df, lambda path: write_artifacts(jobs_df, path), {"sources": list(sources), "full_build": True,
+                                                  "added": len(jobs_df), "updated": 0})
+
+
+def ingest_files(paths, root=SNAPSHOT_ROOT):
+    # Merge batches into the current snapshot and publish the result as a new one
+    version = current_version(root)
+    if version is None:
+        return build_snapshot(job_index.prepare_jobs(pd.concat([read_batch(p) for p in paths]), keep="last"), root, paths)
+
+    jobs_df, keywords, retriever, summaries = load_snapshot(version, root)
+    jobs_df, changed = job_index.refresh_access_tags(jobs_df.copy()), np.empty(0, dtype=np.int64)
+    added = updated = 0
+    for path in paths:
+        jobs_df, batch_changed, batch_added, batch_updated = merge_jobs(jobs_df, read_batch(path))
+        changed = np.union1d(changed, batch_changed)
+        added, updated = added + batch_added, updated + batch_updated
+
+    def build(path):
+        jobs_df.to_parquet(os.path.join(path, INDEX_FILE), index=False)
+        keywords.updated(jobs_df, changed).save(os.path.join(path, KEYWORDS_FILE))
+        retriever.updated(jobs_df, changed, os.path.join(path, VECTORS_FILE), os.path.join(path, META_FILE))
+        job_summaries.update_summaries(summaries, jobs_df, changed, os.path.join(path, SUMMARIES_FILE))
+
+    return _write_snapshot(root, jobs_df, build, {"parent": version, "sources": list(paths), "full_build": False,
+                                                  "added": added, "updated": updated})
+
+
+def pending_batches(incoming=INCOMING_DIR, settle_seconds=2):
+    # Batch files old enough to be fully written, oldest first
+    now = time.time()
+    paths = [p for pattern in BATCH_PATTERNS for p in glob.glob(os.path.join(incoming, pattern))]
+    return sorted((p for p in paths if now - os.path.getmtime(p) >= settle_seconds), key=os.path.getmtime)
+
+
+def watch(incoming=INCOMING_DIR, root=SNAPSHOT_ROOT, interval=5):
+    # Ingested files move to incoming/processed/, unreadable ones to incoming/failed/
+    for name in ("processed", "failed"):
+        os.makedirs(os.path.join(incoming, name), exist_ok=True)
+    while True:
+        paths = pending_batches(incoming)
+        if paths:
+            try:
+                manifest = ingest_files(paths, root)
+                outcome = "processed"
+                print(f"Published {manifest['version']}: {manifest['jobs']} jobs "
+                      f"(+{manifest['added']} new, {manifest['updated']} updated)", flush=True)
+            except Exception as e:
+                outcome = "failed"
+                print(f"❌ Ingest of {len(paths)} file(s) failed: {e}", flush=True)
+            for path in paths:
+                os.replace(path, os.path.join(incoming, outcome, os.path.basename(path)))
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Incrementally ingest job listings into versioned snapshots.")
+    arg_parser.add_argument("--root", default=SNAPSHOT_ROOT)
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init", help="Snapshot the job spreadsheet (job_index.py source)")
+    add_cmd = commands.add_parser("add", help="Ingest CSV/JSONL batch files")
+    add_cmd.add_argument("paths", nargs="+")
+    watch_cmd = commands.add_parser("watch", help="Ingest batches dropped into a directory")
+    watch_cmd.add_argument("--incoming", default=INCOMING_DIR)
+    watch_cmd.add_argument("--interval", type=float, default=5)
+    commands.add_parser("rebuild", help="Full rebuild of the current snapshot's data")
+    args = arg_parser.parse_args()
+
+    if args.command == "init":
+        result = build_snapshot(job_index.load_index(), args.root, [job_index.SOURCE_PATH])
+    elif args.command == "add":
+        result = ingest_files(args.paths, args.root)
+    elif args.command == "rebuild":
+        result = build_snapshot(load_snapshot(current_version(args.root), args.root)[0], args.root)
+    else:
+        watch(args.incoming, args.root, args.interval)
+    print(f"Published {result['version']}: {result['jobs']} jobs")
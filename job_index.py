@@ -0,0 +1,169 @@
+# job_index.py
+#
+# Offline build step that turns the job spreadsheet into a compact Parquet index
+# with cleaned text, deduplicated rows, precomputed filter flags and an
+# accommodation-tag bitset per listing.
+#
+#   python job_index.py                     # rebuild job_index.parquet
+#   python job_index.py --source other.xlsx --dest other.parquet
+
+import argparse
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+SOURCE_PATH = "accessible_jobs_chicago_cursor.xlsx"
+INDEX_PATH = "job_index.parquet"
+
+TEXT_COLUMNS = ["Job Title", "Job Description", "Company Info", "Company Name", "Job Link"]
+
+# --- 1. FILTER PATTERNS (precompiled; matched against lowercased text) ---
+SENIOR_KEYWORDS = ["manager", "senior", "director", "vp", "lead"]
+SENIOR_PATTERN = re.compile("|".join(SENIOR_KEYWORDS))
+DEGREE_PATTERN = re.compile("bachelor|master")
+
+# Flag column -> (pattern, search description as well as title)
+ROLE_FAMILIES = {
+    "RoleTech": (re.compile("software|developer|engineer"), False),
+    "RoleCashier": (re.compile("cashier|clerk|associate|grocery"), False),
+    "RoleVisionSupport": (re.compile("customer|support|chat|accessibility|remote|assistive|reader"), True),
+    "RoleVisionGeneral": (re.compile("screen reader|qa|data entry|accessibility"), True),
+}
+
+# Accommodation / accessibility tags: tag -> (pattern, search title as well as description).
+# All tags of a listing are stored as one bitset in the AccessTags column; bit i is the
+# i-th tag, so only ever append to this table (existing indexes store the positions)
+ACCESS_TAGS = {
+    "Remote": (re.compile(r"\bremote\b|work from home|work-from-home|\bwfh\b|telecommut"), True),
+    "Hybrid": (re.compile(r"\bhybrid\b"), True),
+    "AssistiveTech": (re.compile(r"screen reader|screen-reader|assistive tech|\bjaws\b|\bnvda\b|voiceover"
+                                 r"|speech-to-text|text-to-speech|braille"), False),
+    "Captioning": (re.compile(r"caption|sign language|\basl\b|interpreter"), False),
+    "FlexibleHours": (re.compile(r"flexible (?:work )?(?:hours|schedul)|flex ?time|flexible working"), False),
+    "WheelchairAccess": (re.compile(r"wheelchair|ada[- ]accessible|step-free|accessible (?:office|building|entrance)"),
+                         False),
+    "DegreeRequired": (DEGREE_PATTERN, False),
+    # "3+ years of experience", "5-7 yrs related experience"; not "serving Chicago for 30 years"
+    "ExperienceRequired": (re.compile(r"\b(?:[3-9]|[1-9]\d)\+?(?:\s*(?:-|–|to)\s*\d+)?\s*(?:years|yrs)\.?\s+"
+                                      r"(?:of\s+)?(?:[a-z/-]+\s+){0,2}experience"), False),
+}
+ACCESS_BITS = {tag: 1 << i for i, tag in enumerate(ACCESS_TAGS)}
+ACCESS_DTYPE = np.uint16
+# Tags precise enough to hard-exclude listings on (matcher/filters.py); the others only rank
+REQUIREMENT_TAGS = ["DegreeRequired", "ExperienceRequired"]
+# Changes whenever a tag pattern does; indexes built with other patterns are re-tagged on load
+ACCESS_TAGS_VERSION = hashlib.sha1(
+    repr([(tag, pattern.pattern, include_title) for tag, (pattern, include_title) in ACCESS_TAGS.items()])
+    .encode("utf-8")).hexdigest()[:12]
+FLAG_COLUMNS = ["IsSenior", "RequiresDegree", *ROLE_FAMILIES, "AccessTags"]
+
+
+def make_job_id(title, company):
+    key = f"{title.strip().lower()}|{company.strip().lower()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def access_tag_names(bits):
+    # Tag names set in one AccessTags value
+    return [tag for tag, bit in ACCESS_BITS.items() if int(bits) & bit]
+
+
+def dataset_version(jobs_df):
+    # Fingerprint of the listing set, used to invalidate derived artifacts
+    digest = hashlib.sha1("\n".join(jobs_df["JobId"]).encode("utf-8"))
+    digest.update("\n".join(jobs_df["Job Description"]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# --- 2. BUILD ---
+def prepare_jobs(jobs_df, keep="first"):
+    # keep: which row of a repeated listing survives ("last" for feeds, where later rows are updates)
+    jobs_df = jobs_df.copy()
+    for col in TEXT_COLUMNS:
+        if col in jobs_df.columns:
+            jobs_df[col] = jobs_df[col].fillna("").astype(str)
+    if "Company Name" not in jobs_df.columns:
+        jobs_df["Company Name"] = ""
+
+    # 🧼 Deduplicate by JobId (Job Title + Company Name, ignoring case and surrounding whitespace)
+    jobs_df["JobId"] = [make_job_id(t, c) for t, c in zip(jobs_df["Job Title"], jobs_df["Company Name"])]
+    jobs_df = jobs_df.drop_duplicates(subset="JobId", keep=keep).reset_index(drop=True)
+
+    jobs_df["TitleLower"] = jobs_df["Job Title"].str.lower()
+    jobs_df["DescLower"] = jobs_df["Job Description"].str.lower()
+
+    jobs_df["IsSenior"] = jobs_df["TitleLower"].str.contains(SENIOR_PATTERN)
+    jobs_df["RequiresDegree"] = jobs_df["DescLower"].str.contains(DEGREE_PATTERN)
+    for flag, (pattern, include_desc) in ROLE_FAMILIES.items():
+        hit = jobs_df["TitleLower"].str.contains(pattern)
+        if include_desc:
+            hit |= jobs_df["DescLower"].str.contains(pattern)
+        jobs_df[flag] = hit
+
+    return refresh_access_tags(jobs_df)
+
+
+def access_tags(jobs_df):
+    # AccessTags bitset of every listing (needs the TitleLower / DescLower columns)
+    tags = np.zeros(len(jobs_df), dtype=ACCESS_DTYPE)
+    for tag, (pattern, include_title) in ACCESS_TAGS.items():
+        hit = jobs_df["DescLower"].str.contains(pattern)
+        if include_title:
+            hit |= jobs_df["TitleLower"].str.contains(pattern)
+        tags[hit.to_numpy()] |= ACCESS_BITS[tag]
+    return tags
+
+
+def refresh_access_tags(jobs_df):
+    # Re-tag listings that were tagged with other patterns. The pattern version travels in
+    # the frame's attrs, which Parquet files and pandas operations preserve.
+    if "AccessTags" in jobs_df.columns and jobs_df.attrs.get("access_tags_version") == ACCESS_TAGS_VERSION:
+        return jobs_df
+    jobs_df = jobs_df.assign(AccessTags=access_tags(jobs_df))
+    jobs_df.attrs["access_tags_version"] = ACCESS_TAGS_VERSION
+    return jobs_df
+
+
+def build_index(source=SOURCE_PATH, dest=INDEX_PATH):
+    with metrics.span("read_source"):
+        if source.endswith(".csv"):
+            raw = pd.read_csv(source)
+        else:
+            raw = pd.read_excel(source)
+    jobs_df = prepare_jobs(raw)
+    jobs_df.to_parquet(dest, index=False)
+    return jobs_df
+
+
+# --- 3. LOAD ---
+def index_is_stale(source=SOURCE_PATH, dest=INDEX_PATH):
+    if not os.path.exists(dest):
+        return True
+    return os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(dest)
+
+
+@metrics.timed("load_index")
+def load_index(source=SOURCE_PATH, dest=INDEX_PATH):
+    # Rebuild on first use or when the spreadsheet is newer than the index
+    if index_is_stale(source, dest):
+        return build_index(source, dest)
+    jobs_df = pd.read_parquet(dest, memory_map=True)
+    if jobs_df.attrs.get("access_tags_version") != ACCESS_TAGS_VERSION:
+        jobs_df = refresh_access_tags(jobs_df)
+        jobs_df.to_parquet(dest, index=False)
+    return jobs_df
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Build the precompiled job index.")
+    arg_parser.add_argument("--source", default=SOURCE_PATH)
+    arg_parser.add_argument("--dest", default=INDEX_PATH)
+    args = arg_parser.parse_args()
+
+    built = build_index(args.source, args.dest)
+    print(f"Indexed {len(built)} jobs -> {args.dest}")
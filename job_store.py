@@ -0,0 +1,217 @@
+# job_store.py
+#
+# Sharded job store for multi-metro datasets. Listings are partitioned by region
+# (and optionally by primary role family) into shard directories in the same
+# artifact format as ingest.py snapshots. Shards are loaded lazily, memory-mapped,
+# only when a profile is routed to them; filtering and scoring run on the relevant
+# shards in parallel and the per-shard top-k lists are merged into one global ranking.
+# All shards share one semantic vocabulary so their similarity scores are comparable.
+#
+#   python job_store.py build                # shard the current snapshot (or job index) by region
+#   python job_store.py build --by-role      # ... and by primary role family
+#   python job_store.py list
+#
+# Each shard set records the ingest snapshot it was built from; once ingest.py publishes
+# a newer one, the recommendations page serves that snapshot until the shards are rebuilt.
+#
+# Only the standard library is imported up front (the profile page lists regions on
+# every view); pandas and the matching engine load when shards are built or queried.
+
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import snapshots
+
+SHARD_ROOT = "shards"
+DEFAULT_REGION = "chicago"   # the original dataset is Chicago-only and has no location column
+REGION_COLUMNS = ["Region", "Metro", "City", "Location"]
+OTHER_FAMILY = "other"
+ALL_FAMILIES = "all"
+
+
+# --- 1. PARTITIONING ---
+def region_slug(value):
+    # "Chicago, IL" -> "chicago"
+    city = str(value).split(",")[0].strip().lower()
+    return re.sub(r"[^a-z0-9]+", "-", city).strip("-")
+
+
+def regions_of(jobs_df):
+    import pandas as pd
+
+    column = next((col for col in REGION_COLUMNS if col in jobs_df.columns), None)
+    if column is None:
+        return pd.Series(DEFAULT_REGION, index=jobs_df.index)
+    regions = jobs_df[column].fillna("").map(region_slug)
+    return regions.where(regions != "", DEFAULT_REGION)
+
+
+def families_of(jobs_df):
+    # Primary role family: the first matching ROLE_FAMILIES flag (flags can overlap)
+    import pandas as pd
+    import job_index
+
+    family = pd.Series(OTHER_FAMILY, index=jobs_df.index)
+    for flag in reversed(list(job_index.ROLE_FAMILIES)):
+        family = family.mask(jobs_df[flag], flag[len("Role"):].lower())
+    return family
+
+
+def build_shards(jobs_df, root=SHARD_ROOT, by_role=False, source_version=None):
+    # source_version: the ingest snapshot jobs_df was loaded from (None for the job index)
+    import pandas as pd
+    import ingest
+    import job_index
+    import retrieval
+
+    jobs_df = jobs_df.reset_index(drop=True)
+    model = retrieval.SemanticRetriever.fit(jobs_df)
+    families = families_of(jobs_df) if by_role else pd.Series(ALL_FAMILIES, index=jobs_df.index)
+
+    os.makedirs(root, exist_ok=True)
+    version = snapshots.next_version(root)
+    tmp = os.path.join(root, f".{version}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    shards = []
+    for (region, family), shard_df in jobs_df.groupby([regions_of(jobs_df), families], sort=True):
+        relative = os.path.join(region, family)
+        os.makedirs(os.path.join(tmp, relative))
+        shard_df = shard_df.reset_index(drop=True)
+        ingest.write_artifacts(shard_df, os.path.join(tmp, relative), model)
+        # Per-shard flag counts let the store skip shards a profile's filters would empty
+        eligible = ~shard_df["IsSenior"]
+        shards.append({"region": region, "family": family, "path": relative, "jobs": len(shard_df),
+                       "flags": {flag: int((eligible & shard_df[flag]).sum()) for flag in job_index.ROLE_FAMILIES}})
+
+    manifest = {"version": version, "source_version": source_version, "by_role": by_role, "jobs": len(jobs_df),
+                "shards": shards}
+    with open(os.path.join(tmp, snapshots.MANIFEST_FILE), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.rename(tmp, snapshots.snapshot_dir(version, root))
+    snapshots.publish(version, root)
+    snapshots.prune(root)
+    return manifest
+
+
+def current_version(root=SHARD_ROOT):
+    return snapshots.current_version(root)
+
+
+def read_manifest(version, root=SHARD_ROOT):
+    return snapshots.read_manifest(version, root)
+
+
+def source_version(version, root=SHARD_ROOT):
+    # Ingest snapshot the shard set was built from (None: built from the job index)
+    return read_manifest(version, root).get("source_version")
+
+
+def is_current(version, snapshot_version, root=SHARD_ROOT):
+    # False once ingest.py has published a snapshot the shards don't hold yet
+    return version is not None and source_version(version, root) == snapshot_version
+
+
+def available_regions(root=SHARD_ROOT):
+    version = current_version(root)
+    if version is None:
+        return []
+    return sorted({shard["region"] for shard in read_manifest(version, root)["shards"]})
+
+
+# --- 2. QUERYING ---
+class ShardedJobStore:
+    # Same recommend()/candidate_count() interface as JobMatcher
+    def __init__(self, root=SHARD_ROOT, version=None, max_workers=None):
+        self.version = version or current_version(root)
+        if self.version is None:
+            raise FileNotFoundError(f"No shards built under {root!r} (run: python job_store.py build)")
+        self.path = snapshots.snapshot_dir(self.version, root)
+        manifest = read_manifest(self.version, root)
+        self.by_role = manifest["by_role"]
+        self.shards = {(s["region"], s["family"]): s for s in manifest["shards"]}
+        self.regions = sorted({region for region, _ in self.shards})
+
+        self._matchers = {}    # shard key -> JobMatcher (loaded on first use)
+        self._summaries = {}   # shard key -> summaries frame
+        self._load_locks = {key: threading.Lock() for key in self.shards}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or min(8, len(self.shards)),
+                                        thread_name_prefix="shard")
+
+    def _load(self, key):
+        import ingest
+        from matcher import JobMatcher
+
+        with self._load_locks[key]:
+            if key not in self._matchers:
+                jobs_df, keywords, retriever, summaries = ingest.load_artifacts(
+                    os.path.join(self.path, self.shards[key]["path"]))
+                self._summaries[key] = summaries
+                self._matchers[key] = JobMatcher(jobs_df, retriever=retriever, keyword_index=keywords)
+        return self._matchers[key]
+
+    def shards_for(self, profile):
+        # Profile regions (all regions if none chosen), minus shards with no job in its role family
+        from matcher import role_flag
+
+        regions = set(profile.get("regions") or self.regions)
+        flag = role_flag(profile)
+        return [key for key, shard in self.shards.items()
+                if key[0] in regions and (flag is None or shard["flags"][flag] > 0)]
+
+    def _map(self, fn, profile):
+        return list(self._pool.map(lambda key: (key, fn(self._load(key))), self.shards_for(profile)))
+
+    def recommend(self, profile, k=20):
+        # Global top-k: the best k of the per-shard top-k lists
+        import pandas as pd
+        from matcher.filters import rank_columns
+
+        results = self._map(lambda matcher: matcher.recommend(profile, k), profile)
+        if not results:
+            empty = self._load(next(iter(self.shards))).jobs.iloc[:0]
+            return empty.assign(AccessScore=0, RelevanceScore=0, SemanticScore=0.0, Region="")
+        merged = pd.concat([top.assign(Region=key[0]) for key, top in results], ignore_index=True)
+        return merged.sort_values(rank_columns(profile, "LearnedScore" in merged.columns), ascending=False,
+                                   kind="stable").head(k)
+
+    def candidate_count(self, profile):
+        return sum(count for _, count in self._map(lambda matcher: matcher.candidate_count(profile), profile))
+
+    def lookup(self, job_id):
+        # (summary, company overview) from whichever loaded shard holds the job
+        import job_summaries
+
+        for summaries in list(self._summaries.values()):
+            found = job_summaries.lookup(summaries, job_id)
+            if found is not None:
+                return found
+        return None
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Build or inspect the sharded job store.")
+    arg_parser.add_argument("--root", default=SHARD_ROOT)
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="Shard the current ingest snapshot (or the job index)")
+    build_cmd.add_argument("--by-role", action="store_true", help="Also partition by primary role family")
+    commands.add_parser("list", help="Show the published shards")
+    args = arg_parser.parse_args()
+
+    if args.command == "build":
+        import ingest
+        import job_index
+
+        snapshot = ingest.current_version()
+        source = ingest.load_snapshot(snapshot)[0] if snapshot else job_index.load_index()
+        built = build_shards(source, args.root, args.by_role, source_version=snapshot)
+        print(f"Published {built['version']}: {built['jobs']} jobs in {len(built['shards'])} shards")
+    else:
+        version = current_version(args.root)
+        for shard in read_manifest(version, args.root)["shards"] if version else []:
+            print(f"{shard['region']:<20} {shard['family']:<16} {shard['jobs']:>9} jobs")
@@ -0,0 +1,104 @@
+# job_summaries.py
+#
+# Precomputes a short job summary and company overview for every listing once per
+# dataset version, so the recommendation prompt only has to ask Gemini for the
+# "why it fits" reasoning. Summaries are joined back in by JobId at render time.
+#
+#   python job_summaries.py      # (re)build job_summaries.parquet from the job index
+
+import os
+import re
+from collections import Counter
+
+import pandas as pd
+
+import job_index
+from retrieval import STOPWORDS
+
+SUMMARIES_PATH = "job_summaries.parquet"
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#']*")
+
+
+# --- 1. EXTRACTIVE SUMMARIZER ---
+def _clip(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + " …"
+
+
+def split_sentences(text):
+    return [s.strip(" -•*\t") for s in SENTENCE_SPLIT.split(text) if len(s.strip(" -•*\t")) > 2]
+
+
+def extractive_summary(text, max_sentences=2, max_chars=320):
+    # Pick the sentences whose words are most frequent across the description,
+    # keeping them in their original order
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return _clip(" ".join(sentences), max_chars)
+
+    words = [[w for w in WORD_PATTERN.findall(s.lower()) if w not in STOPWORDS] for s in sentences]
+    freq = Counter(w for sentence_words in words for w in sentence_words)
+    scores = [sum(freq[w] for w in ws) / (len(ws) + 1) for ws in words]
+    scores[0] *= 1.2  # opening sentence usually states the role
+    best = sorted(sorted(range(len(sentences)), key=lambda i: -scores[i])[:max_sentences])
+    return _clip(" ".join(sentences[i] for i in best), max_chars)
+
+
+def company_overview(company_info, max_chars=200):
+    sentences = split_sentences(company_info)
+    return _clip(sentences[0], max_chars) if sentences else ""
+
+
+# --- 2. BATCH PIPELINE ---
+def _summarize(jobs_df, summarize, overview):
+    company_info = jobs_df["Company Info"] if "Company Info" in jobs_df.columns else pd.Series("", index=jobs_df.index)
+    return pd.DataFrame({
+        "JobId": jobs_df["JobId"].to_numpy(),
+        "Summary": [summarize(text) for text in jobs_df["Job Description"]],
+        "CompanyOverview": [overview(text) for text in company_info.fillna("")],
+    }).drop_duplicates("JobId")
+
+
+def _store(summaries, jobs_df, dest):
+    summaries["DatasetVersion"] = job_index.dataset_version(jobs_df)
+    summaries.to_parquet(dest, index=False)
+    return summaries.set_index("JobId")
+
+
+def build_summaries(jobs_df, dest=SUMMARIES_PATH, summarize=extractive_summary, overview=company_overview):
+    # summarize/overview can be swapped for an offline (batched) LLM pass
+    return _store(_summarize(jobs_df, summarize, overview), jobs_df, dest)
+
+
+def update_summaries(summaries, jobs_df, changed_positions, dest=SUMMARIES_PATH,
+                     summarize=extractive_summary, overview=company_overview):
+    # Re-summarize only the changed (edited or appended) rows; everything else is reused
+    fresh = _summarize(jobs_df.iloc[changed_positions], summarize, overview)
+    kept = summaries[summaries.index.isin(jobs_df["JobId"]) & ~summaries.index.isin(fresh["JobId"])]
+    kept = kept.drop(columns="DatasetVersion").reset_index()
+    return _store(pd.concat([kept, fresh], ignore_index=True), jobs_df, dest)
+
+
+def load_summaries(jobs_df, path=SUMMARIES_PATH):
+    # Reuse stored summaries unless the dataset changed since they were built
+    if os.path.exists(path):
+        summaries = pd.read_parquet(path)
+        if len(summaries) and summaries["DatasetVersion"].iloc[0] == job_index.dataset_version(jobs_df):
+            return summaries.set_index("JobId")
+    return build_summaries(jobs_df, path)
+
+
+def lookup(summaries, job_id):
+    # (summary, company overview) for a job id, or None if unknown
+    if job_id not in summaries.index:
+        return None
+    row = summaries.loc[job_id]
+    return row["Summary"], row["CompanyOverview"]
+
+
+if __name__ == "__main__":
+    built = build_summaries(job_index.load_index())
+    print(f"Summarized {len(built)} jobs -> {SUMMARIES_PATH}")
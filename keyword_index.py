@@ -0,0 +1,103 @@
+# keyword_index.py
+#
+# Token-level inverted index over job title + description, with NumPy scoring.
+# Built once per dataset; scoring a profile touches only the postings of the
+# profile's keywords instead of every row.
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+PUNCTUATION = ".,;:!?()[]{}\"'`*"
+
+# "compat": keyword matches a job if it appears anywhere in the text (the original
+#           substring test in compute_relevance), counted once per keyword.
+# "token":  keyword must equal a whole token (punctuation stripped).
+SCORING_MODES = ("compat", "token")
+
+
+class KeywordIndex:
+    def __init__(self, vocab, indptr, postings, n_jobs):
+        self.vocab = vocab              # sorted unique whitespace tokens
+        self.indptr = indptr            # postings for term t: postings[indptr[t]:indptr[t + 1]]
+        self.postings = postings        # job positions, grouped by term
+        self.posting_terms = np.repeat(np.arange(len(vocab)), np.diff(indptr))
+        self.n_jobs = n_jobs
+
+        self._vocab_series = pd.Series(vocab, dtype=object)
+        stripped = self._vocab_series.str.strip(PUNCTUATION)
+        self._token_lookup = pd.Series(np.arange(len(vocab))).groupby(stripped.to_numpy()).indices
+        self._term_cache = {}
+
+    @staticmethod
+    def _pairs(jobs_df, positions):
+        # Distinct (job position, token) pairs for the given rows
+        if "TitleLower" in jobs_df.columns:
+            text = jobs_df["TitleLower"] + " " + jobs_df["DescLower"]
+        else:
+            text = (jobs_df["Job Title"].fillna("") + " " + jobs_df["Job Description"].fillna("")).str.lower()
+        text = pd.Series(text.to_numpy(), index=positions)
+        tokens = text.str.split().explode().dropna()
+        return pd.DataFrame({"job": tokens.index.to_numpy(), "term": tokens.to_numpy()}).drop_duplicates()
+
+    @classmethod
+    def _from_pairs(cls, pairs, n_jobs):
+        codes, vocab = pd.factorize(pairs["term"], sort=True)
+        order = np.argsort(codes, kind="stable")
+        postings = pairs["job"].to_numpy()[order].astype(np.int32)
+        indptr = np.searchsorted(codes[order], np.arange(len(vocab) + 1))
+        return cls(np.asarray(vocab, dtype=object), indptr, postings, n_jobs)
+
+    @classmethod
+    def from_jobs(cls, jobs_df):
+        # Positions follow jobs_df row order, so scores line up with a RangeIndex
+        return cls._from_pairs(cls._pairs(jobs_df, np.arange(len(jobs_df))), len(jobs_df))
+
+    def updated(self, jobs_df, changed_positions):
+        # New index for jobs_df where only the rows at changed_positions (edited or
+        # appended) differ from the rows this index was built from; only those are re-tokenized
+        changed_positions = np.asarray(changed_positions, dtype=np.int64)
+        keep = ~np.isin(self.postings, changed_positions) & (self.postings < len(jobs_df))
+        kept = pd.DataFrame({"job": self.postings[keep], "term": self.vocab[self.posting_terms[keep]]})
+        fresh = self._pairs(jobs_df.iloc[changed_positions], changed_positions)
+        return self._from_pairs(pd.concat([kept, fresh], ignore_index=True), len(jobs_df))
+
+    # --- PERSISTENCE ---
+    def save(self, path):
+        np.savez(path, vocab=self.vocab, indptr=self.indptr, postings=self.postings, n_jobs=self.n_jobs)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=True)
+        return cls(data["vocab"], data["indptr"], data["postings"], int(data["n_jobs"]))
+
+    def _match_terms(self, keyword, mode):
+        cache_key = (keyword, mode)
+        if cache_key not in self._term_cache:
+            if mode == "compat":
+                hits = self._vocab_series.str.contains(keyword, regex=False).to_numpy()
+                term_ids = np.flatnonzero(hits)
+            elif mode == "token":
+                term_ids = self._token_lookup.get(keyword.strip(PUNCTUATION), np.empty(0, dtype=np.int64))
+            else:
+                raise ValueError(f"Unknown scoring mode: {mode!r} (expected one of {SCORING_MODES})")
+            self._term_cache[cache_key] = term_ids
+        return self._term_cache[cache_key]
+
+    def _jobs_for_terms(self, term_ids):
+        if len(term_ids) == 1:
+            t = term_ids[0]
+            return self.postings[self.indptr[t]:self.indptr[t + 1]]
+        term_mask = np.zeros(len(self.vocab), dtype=bool)
+        term_mask[term_ids] = True
+        return np.unique(self.postings[term_mask[self.posting_terms]])
+
+    def score(self, keywords, mode="compat"):
+        # Number of profile keywords matched by each job (duplicates count each time)
+        scores = np.zeros(self.n_jobs, dtype=np.int32)
+        for keyword, count in Counter(keywords).items():
+            term_ids = self._match_terms(keyword, mode)
+            if len(term_ids):
+                scores[self._jobs_for_terms(term_ids)] += count
+        return scores
@@ -1,30 +1,45 @@
 # langchain_utils.py
+#
+# LangChain is imported on first use, and the output parsers and prompt template are
+# built once when first needed (functools.cache), so importing this module at page
+# load stays cheap. The old module-level names (parser, structured_prompt_template,
+# ...) still resolve lazily through __getattr__.
 
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import HumanMessage, AIMessage
-from langchain.output_parsers import StructuredOutputParser, ResponseSchema
-from langchain.prompts import PromptTemplate
+import functools
+import os
 
-import pyttsx3
+import metrics
+from session_memory import SessionMemory, InMemoryBackend, SQLiteBackend
+from tts_worker import get_speech_worker, speech_text
 
 # --- 1. MEMORY SETUP ---
-memory = ConversationBufferMemory(return_messages=True)
+# Bounded per-session memory; set MEMORY_BACKEND=sqlite to share it across workers
+if os.environ.get("MEMORY_BACKEND", "memory") == "sqlite":
+    memory = SessionMemory(SQLiteBackend())
+else:
+    memory = SessionMemory(InMemoryBackend())
 
 
-def add_to_memory(user_input, ai_response):
-    memory.chat_memory.add_user_message(user_input)
-    memory.chat_memory.add_ai_message(ai_response)
+@metrics.timed("add_to_memory")
+def add_to_memory(user_input, ai_response, session_id="default"):
+    memory.add_exchange(session_id, user_input, ai_response)
 
 
-def get_memory_messages():
-    return memory.load_memory_variables({})['history']
+def get_memory_messages(session_id="default"):
+    from langchain.schema import HumanMessage, AIMessage
+
+    return [
+        HumanMessage(content=content) if role == "human" else AIMessage(content=content)
+        for role, content in memory.messages(session_id)
+    ]
 
 
 # --- 2. TEXT-TO-SPEECH ---
+@metrics.timed("speak_text")
 def speak_text(text):
-    engine = pyttsx3.init()
-    engine.say(text)
-    engine.runAndWait()
+    # Non-blocking: queues synthesis on the background worker and returns the
+    # audio file path (ready once it exists; play it with st.audio)
+    return get_speech_worker().submit(speech_text(text))
 
 
 # --- 3. INCLUSIVITY EXPLANATION PROMPT ---
@@ -41,17 +56,7 @@ Provide a short explanation in 2-3 sentences.
 
 
 # --- 4. OUTPUT PARSER EXAMPLE (OPTIONAL STRUCTURED FORMAT) ---
-response_schemas = [
-    ResponseSchema(name="reason", description="Explanation of inclusivity."),
-    ResponseSchema(name="score", description="Numeric inclusivity score from 1 to 10")
-]
-
-parser = StructuredOutputParser.from_response_schemas(response_schemas)
-
-output_format_instructions = parser.get_format_instructions()
-
-structured_prompt_template = PromptTemplate(
-    template="""
+STRUCTURED_PROMPT = """
 Given the following job description:
 
 {job_desc}
@@ -59,13 +64,85 @@ Given the following job description:
 Please explain why it's inclusive and provide a numeric score.
 
 {format_instructions}
-""",
-    input_variables=["job_desc"],
-    partial_variables={"format_instructions": output_format_instructions}
-)
+"""
+
+
+@functools.cache
+def get_inclusivity_parser():
+    from langchain.output_parsers import StructuredOutputParser, ResponseSchema
+
+    response_schemas = [
+        ResponseSchema(name="reason", description="Explanation of inclusivity."),
+        ResponseSchema(name="score", description="Numeric inclusivity score from 1 to 10")
+    ]
+    return StructuredOutputParser.from_response_schemas(response_schemas)
+
+
+@functools.cache
+def get_structured_prompt_template():
+    from langchain.prompts import PromptTemplate
+
+    return PromptTemplate(
+        template=STRUCTURED_PROMPT,
+        input_variables=["job_desc"],
+        partial_variables={"format_instructions": get_inclusivity_parser().get_format_instructions()}
+    )
+
 
 def get_structured_prompt(job_desc):
-    return structured_prompt_template.format(job_desc=job_desc)
+    return get_structured_prompt_template().format(job_desc=job_desc)
 
+@metrics.timed("parse_structured_response")
 def parse_structured_response(response_text):
-    return parser.parse(response_text)
\ No newline at end of file
+    return get_inclusivity_parser().parse(response_text)
+
+
+# --- 5. STRUCTURED RECOMMENDATIONS (JSON OUTPUT MODE) ---
+# Parsed by recommendation_parser.StructuredCardParser, which validates each match
+# and recovers the complete ones from a truncated response
+STRUCTURED_RECOMMENDATION_SPEC = """🎯 Return the **top 10 job matches** that best fit the user’s profile, using only the listings above, plus interview advice. The job summary and company overview are shown to the user separately, so do not repeat them. Respond with JSON only.
+
+{format_instructions}
+"""
+
+
+@functools.cache
+def get_recommendation_output_parser():
+    from langchain.output_parsers import StructuredOutputParser, ResponseSchema
+
+    recommendation_schemas = [
+        ResponseSchema(
+            name="matches",
+            type="array",
+            description="The top 10 job matches, best first. Each item is an object with the string fields "
+                        "job_id (the Job ID from the listing), job_title, company, why_fit (why this job fits "
+                        "the user, focusing on technical + accessibility fit) and job_link (the listing's URL)",
+        ),
+        ResponseSchema(
+            name="interview_advice",
+            type="string",
+            description="Interview tips tailored to the user's background, disability, and role goals, as markdown",
+        ),
+    ]
+    return StructuredOutputParser.from_response_schemas(recommendation_schemas)
+
+
+@functools.cache
+def get_recommendation_output_spec():
+    return STRUCTURED_RECOMMENDATION_SPEC.format(
+        format_instructions=get_recommendation_output_parser().get_format_instructions())
+
+
+# --- 6. LAZY MODULE ATTRIBUTES (names that used to be built at import) ---
+_LAZY_ATTRIBUTES = {
+    "parser": get_inclusivity_parser,
+    "output_format_instructions": lambda: get_inclusivity_parser().get_format_instructions(),
+    "structured_prompt_template": get_structured_prompt_template,
+    "recommendation_output_parser": get_recommendation_output_parser,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
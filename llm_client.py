@@ -0,0 +1,192 @@
+# llm_client.py
+#
+# Shared Gemini gateway: one configured client per process, running on a dedicated
+# asyncio loop thread. Requests go through a token-bucket rate limiter and a
+# concurrency cap, retry with exponential backoff on 429/5xx and timeouts, and
+# identical in-flight requests are coalesced onto a single call.
+#
+#   client = get_llm_client(st.secrets["GEMINI_API_KEY"])
+#   text = client.generate_sync(prompt, generation_config={...})       # blocking
+#   text = await client.generate(prompt)                               # asyncio
+#   for piece in client.stream_sync(prompt): ...                       # streamed
+
+import asyncio
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+
+DEFAULT_MODEL = "models/gemini-1.5-flash-latest"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+# --- 1. RATE LIMITING ---
+class TokenBucket:
+    def __init__(self, rate_per_sec, burst):
+        self.rate = rate_per_sec
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_retryable(exc):
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    code = getattr(exc, "code", None)
+    code = getattr(code, "value", code)  # grpc status enums wrap the number
+    return code in RETRYABLE_STATUS
+
+
+def request_key(model_name, prompt, generation_config):
+    blob = json.dumps([model_name, prompt, generation_config], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# --- 2. GATEWAY ---
+class LLMClient:
+    def __init__(self, api_key, requests_per_minute=60, burst=5, max_concurrency=8,
+                 timeout=60, max_retries=4, backoff_base=1.0):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models = {}
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.stats = {"requests": 0, "coalesced": 0, "retries": 0, "errors": 0}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+
+        # Loop-bound primitives must be created on the gateway loop
+        async def init_primitives():
+            self._bucket = TokenBucket(requests_per_minute / 60, burst)
+            self._semaphore = asyncio.Semaphore(max_concurrency)
+            self._in_flight = {}
+        asyncio.run_coroutine_threadsafe(init_primitives(), self._loop).result()
+
+    def model(self, model_name=DEFAULT_MODEL):
+        if model_name not in self._models:
+            self._models[model_name] = self._genai.GenerativeModel(model_name)
+        return self._models[model_name]
+
+    async def _with_retries(self, call):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._bucket.acquire()
+                async with self._semaphore:
+                    return await asyncio.wait_for(call(), timeout=self.timeout)
+            except Exception as exc:
+                if attempt == self.max_retries or not is_retryable(exc):
+                    self.stats["errors"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.backoff_base * (2 ** attempt) * (0.5 + random.random()))
+
+    async def _generate(self, prompt, model_name, generation_config):
+        self.stats["requests"] += 1
+        model = self.model(model_name)
+
+        async def call():
+            response = await model.generate_content_async(prompt, generation_config=generation_config)
+            return response.text
+        return await self._with_retries(call)
+
+    async def _generate_coalesced(self, prompt, model_name, generation_config):
+        key = request_key(model_name, prompt, generation_config)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(self._generate(prompt, model_name, generation_config))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def generate(self, prompt, model_name=DEFAULT_MODEL, generation_config=None):
+        # Awaitable from any event loop; the work itself runs on the gateway loop
+        future = asyncio.run_coroutine_threadsafe(
+            self._generate_coalesced(prompt, model_name, generation_config), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def generate_sync(self, prompt, model_name=DEFAULT_MODEL, generation_config=None):
+        future = asyncio.run_coroutine_threadsafe(
+            self._generate_coalesced(prompt, model_name, generation_config), self._loop)
+        return future.result()
+
+    def stream_sync(self, prompt, model_name=DEFAULT_MODEL, generation_config=None):
+        # Yields text chunks as they arrive; retries only before the first chunk. Each chunk
+        # must arrive within the timeout, and closing the generator early cancels the request.
+        chunks = queue.Queue()
+        done = object()
+        model = self.model(model_name)
+
+        async def produce():
+            self.stats["requests"] += 1
+
+            async def open_stream():
+                return await model.generate_content_async(prompt, generation_config=generation_config, stream=True)
+            try:
+                response = await self._with_retries(open_stream)
+                async with self._semaphore:
+                    stream = response.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(stream.__anext__(), timeout=self.timeout)
+                        except StopAsyncIteration:
+                            break
+                        chunks.put(chunk.text)
+            except Exception as exc:
+                chunks.put(exc)
+            finally:
+                chunks.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), self._loop)
+        received = False
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=self.timeout)
+                except queue.Empty:
+                    if future.done():
+                        return  # cancelled before it could signal
+                    if received:
+                        raise asyncio.TimeoutError("Response stream stalled")
+                    continue  # still opening the stream (bounded by the retries)
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                received = True
+                yield item
+        finally:
+            future.cancel()  # releases the concurrency slot if the caller stopped early
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client(api_key, **options):
+    # One pooled client per process; options only apply on first creation
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient(api_key, **options)
+        return _client
@@ -0,0 +1,9 @@
+# matcher
+#
+# Importable matching engine shared by the Streamlit pages, the batch CLI and
+# benchmarks.
+
+from matcher.engine import JobMatcher
+from matcher.filters import filter_jobs, rank_jobs, match_jobs, role_flag, skill_string
+
+__all__ = ["JobMatcher", "filter_jobs", "rank_jobs", "match_jobs", "role_flag", "skill_string"]
@@ -0,0 +1,105 @@
+# matcher/engine.py
+#
+# JobMatcher: the warm matching engine. It holds the loaded job index, the
+# precompiled filter patterns, the derived keyword/semantic indexes and the learned
+# re-ranker (if one has been trained), and
+# memoizes each profile's ranking so Streamlit reruns are cheap lookups.
+# Create it once per process (st.cache_resource) and share it.
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import inclusivity_scores
+import job_index
+import metrics
+import reranker
+import retrieval
+from keyword_index import KeywordIndex
+from matcher.filters import filter_jobs, rank_jobs
+
+# Profile fields the ranking depends on (order-sensitive: the filters read disability[0])
+RANKING_FIELDS = ["skills", "preferred_role", "disability", "work_setup", "education", "accommodations",
+                  "experience_level", "schedule", "min_inclusivity", "rank_by_inclusivity"]
+SCORE_COLUMNS = ["AccessScore", "RelevanceScore", "SemanticScore", "LearnedScore", "BlendedScore"]
+
+
+class JobMatcher:
+    def __init__(self, jobs_df, retriever=None, cache_size=256, keyword_index=None, learned=None):
+        if any(col not in jobs_df.columns for col in ["JobId", *job_index.FLAG_COLUMNS]):
+            jobs_df = job_index.prepare_jobs(jobs_df)
+        jobs_df = job_index.refresh_access_tags(jobs_df)
+        if "InclusivityScore" not in jobs_df.columns:
+            jobs_df = inclusivity_scores.attach_scores(jobs_df)
+        self.jobs = jobs_df.reset_index(drop=True)
+
+        # Precompiled patterns behind the index flags (for ad-hoc checks on new text)
+        self.senior_pattern = job_index.SENIOR_PATTERN
+        self.degree_pattern = job_index.DEGREE_PATTERN
+        self.role_patterns = {flag: pattern for flag, (pattern, _) in job_index.ROLE_FAMILIES.items()}
+
+        self.keyword_index = keyword_index if keyword_index is not None else KeywordIndex.from_jobs(self.jobs)
+        self.retriever = retriever if retriever is not None else retrieval.load_retriever(self.jobs)
+        self.learned = learned if learned is not None else reranker.load_reranker()
+        self.version = job_index.dataset_version(self.jobs)
+
+        self.cache_size = cache_size
+        self._rankings = OrderedDict()   # profile key -> (positions, {score column: scores})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_index(cls, source=job_index.SOURCE_PATH, dest=job_index.INDEX_PATH):
+        return cls(job_index.load_index(source, dest))
+
+    @staticmethod
+    def profile_key(profile):
+        blob = json.dumps([profile.get(field) for field in RANKING_FIELDS], default=str)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def is_senior(self, title):
+        return bool(self.senior_pattern.search(title.lower()))
+
+    # --- 1. RANKING ---
+    def _compute(self, profile, profile_vector=None):
+        ranked = rank_jobs(filter_jobs(self.jobs, profile), profile, self.keyword_index, self.retriever,
+                           profile_vector, self.learned)
+        return ranked.index.to_numpy(), {col: ranked[col].to_numpy() for col in SCORE_COLUMNS if col in ranked}
+
+    def _ranking(self, profile, profile_vector=None):
+        key = self.profile_key(profile)
+        with self._lock:
+            hit = key in self._rankings
+            if hit:
+                self._rankings.move_to_end(key)
+                ranking = self._rankings[key]
+        metrics.record_cache("ranking", hit)
+        if hit:
+            return ranking
+        ranking = self._compute(profile, profile_vector)
+        with self._lock:
+            self._rankings[key] = ranking
+            while len(self._rankings) > self.cache_size:
+                self._rankings.popitem(last=False)
+        return ranking
+
+    def _frame(self, ranking, k=None):
+        positions, scores = ranking
+        return self.jobs.iloc[positions[:k]].assign(**{col: values[:k] for col, values in scores.items()})
+
+    def rank(self, profile):
+        # All candidates that pass the filters, best first
+        return self._frame(self._ranking(profile))
+
+    def recommend(self, profile, k=20):
+        # Top-k candidates for the LLM prompt
+        return self._frame(self._ranking(profile), k)
+
+    def candidate_count(self, profile):
+        return len(self._ranking(profile)[0])
+
+    def recommend_many(self, profiles, k=20):
+        # Batch variant: embeds all profiles in one pass
+        profiles = list(profiles)
+        vectors = self.retriever.embed([retrieval.profile_text(p) for p in profiles])
+        return [self._frame(self._ranking(p, vectors[i:i + 1]), k) for i, p in enumerate(profiles)]
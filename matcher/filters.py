@@ -0,0 +1,156 @@
+# matcher/filters.py
+#
+# Candidate filtering and ranking: degree/experience/work-setup/seniority/role-family
+# filters over the precomputed index flags and accommodation tags, then ranking by
+# accommodations offered, semantic similarity and keyword relevance.
+
+import numpy as np
+
+import job_index
+import metrics
+import reranker
+import retrieval
+
+LOWER_EDUCATION_LEVELS = ["high school", "secondary", "ged", "diploma", "associate"]
+TECH_SKILL_WORDS = ["python", "java", "sql", "software", "developer", "engineer"]
+CASHIER_SKILL_WORDS = ["pos", "cash handling", "customer service"]
+ENTRY_EXPERIENCE_LEVELS = ["0–1 years", "1–3 years"]
+
+# Profile form choices (pages/1_User_Profile.py) -> job_index.ACCESS_TAGS
+ACCOMMODATION_TAGS = {
+    "Wheelchair-accessible workspace": "WheelchairAccess",
+    "Screen reader-friendly environment": "AssistiveTech",
+    "Sign language interpreter or captioning": "Captioning",
+    "Flexible work hours": "FlexibleHours",
+    "Remote work options": "Remote",
+    "Assistive technology (e.g., speech-to-text software)": "AssistiveTech",
+}
+WORK_SETUP_TAGS = {
+    "Fully remote (Work from home)": "Remote",
+    "Hybrid (Mix of remote & in-office)": "Hybrid",
+}
+
+# Best candidates first
+RANK_COLUMNS = ["AccessScore", "SemanticScore", "RelevanceScore"]
+# With a trained re-ranker (reranker.py): the semantic score blended with its probability
+LEARNED_RANK_COLUMNS = ["AccessScore", "BlendedScore", "SemanticScore", "RelevanceScore"]
+
+
+def rank_columns(profile, learned=False):
+    # The learned re-ranker only nudges the hand-set order (see reranker.blend); optionally
+    # lead with the offline inclusivity score (inclusivity_scores.py)
+    columns = LEARNED_RANK_COLUMNS if learned else RANK_COLUMNS
+    if profile.get("rank_by_inclusivity"):
+        return ["InclusivityScore", *columns]
+    return columns
+
+
+def skill_string(profile):
+    return " ".join(profile.get("skills", [])).lower()
+
+
+def tag_bits(tags):
+    bits = 0
+    for tag in tags:
+        bits |= job_index.ACCESS_BITS[tag]
+    return bits
+
+
+def wanted_tags(profile):
+    # Accommodations the listing should mention; ranked on, not required (most listings say nothing)
+    return tag_bits({ACCOMMODATION_TAGS[a] for a in profile.get("accommodations", []) if a in ACCOMMODATION_TAGS})
+
+
+def work_setup_tags(profile):
+    # Work setups the user accepts (any of them will do); 0 when on-site work is acceptable too
+    work_setup = profile.get("work_setup", [])
+    if not work_setup or any(w not in WORK_SETUP_TAGS for w in work_setup):
+        return 0
+    return tag_bits({WORK_SETUP_TAGS[w] for w in work_setup})
+
+
+def excluded_tags(profile):
+    # Requirements the user does not meet (only job_index.REQUIREMENT_TAGS ever exclude)
+    education = profile.get("education", "").lower()
+    tags = set()
+    if any(level in education for level in LOWER_EDUCATION_LEVELS):
+        tags.add("DegreeRequired")
+    if profile.get("experience_level") in ENTRY_EXPERIENCE_LEVELS:
+        tags.add("ExperienceRequired")
+    return tag_bits(tags & set(job_index.REQUIREMENT_TAGS))
+
+
+def access_score(jobs_df, profile):
+    # Number of the profile's wanted accommodations each listing mentions
+    tags = jobs_df["AccessTags"].to_numpy()
+    wanted = wanted_tags(profile)
+    score = np.zeros(len(tags), dtype=np.int8)
+    for bit in job_index.ACCESS_BITS.values():
+        if wanted & bit:
+            score += (tags & bit) != 0
+    return score
+
+
+def role_flag(profile):
+    # Role-family flag column the profile is restricted to, or None for all families
+    skills = skill_string(profile)
+    preferred_role = profile.get("preferred_role", "").lower()
+    disability = profile.get("disability", [])
+
+    # Skill-based filtering logic
+    if any(word in skills for word in TECH_SKILL_WORDS):
+        return "RoleTech"
+    if "cashier" in preferred_role or any(skill in skills for skill in CASHIER_SKILL_WORDS):
+        return "RoleCashier"
+    if disability and "vision" in disability[0].lower() and work_setup_tags(profile) & job_index.ACCESS_BITS["Remote"]:
+        if "customer service" in preferred_role:
+            return "RoleVisionSupport"
+        return "RoleVisionGeneral"
+    return None
+
+
+@metrics.timed("filter")
+def filter_jobs(jobs_df, profile):
+    # Keeps the original row labels so scores over the full index can be aligned
+    # Filter out senior-level jobs
+    mask = ~jobs_df["IsSenior"]
+
+    # 🎓 Bitmask tests on the accommodation tags: no degree / experience requirement the
+    # user doesn't meet, and at least one of the work setups they accept
+    tags = jobs_df["AccessTags"].to_numpy()
+    mask &= (tags & excluded_tags(profile)) == 0
+    setups = work_setup_tags(profile)
+    if setups:
+        mask &= (tags & setups) != 0
+
+    # Minimum offline inclusivity score, if the user set one (unscored listings are dropped)
+    if profile.get("min_inclusivity"):
+        mask &= jobs_df["InclusivityScore"] >= profile["min_inclusivity"]
+
+    flag = role_flag(profile)
+    if flag is not None:
+        mask &= jobs_df[flag]
+    return jobs_df[mask]
+
+
+def rank_jobs(jobs_df, profile, keyword_index, retriever, profile_vector=None, learned=None):
+    # Keyword relevance (scored over the whole index, aligned by original position)
+    # plus semantic similarity, then the learned re-ranker if given; best candidates first
+    positions = jobs_df.index.to_numpy()
+    with metrics.span("relevance"):
+        relevance = keyword_index.score(skill_string(profile).split(), mode="compat")
+    with metrics.span("semantic_rank"):
+        if profile_vector is None:
+            profile_vector = retriever.embed([retrieval.profile_text(profile)])
+        semantic = retriever.similarity(profile_vector, positions)[0]
+        jobs_df = jobs_df.assign(AccessScore=access_score(jobs_df, profile), RelevanceScore=relevance[positions],
+                                 SemanticScore=semantic)
+    if learned is not None:
+        with metrics.span("rerank"):
+            logits = learned.score(jobs_df, profile)
+            jobs_df = jobs_df.assign(LearnedScore=logits, BlendedScore=reranker.blend(semantic, logits))
+    return jobs_df.sort_values(rank_columns(profile, learned is not None), ascending=False)
+
+
+def match_jobs(jobs_df, profile, keyword_index, retriever, profile_vector=None, learned=None):
+    return rank_jobs(filter_jobs(jobs_df, profile), profile, keyword_index, retriever, profile_vector, learned)
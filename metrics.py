@@ -0,0 +1,258 @@
+# metrics.py
+#
+# Lightweight instrumentation: timing spans around pipeline stages, token and
+# cache counters, an opt-in rotating JSON-lines metrics log, a Prometheus text endpoint
+# and a per-run breakdown for the debug sidebar panel. Standard library only.
+#
+#   with metrics.span("build_prompt"): ...
+#   @metrics.timed("load_index")
+#   metrics.record_tokens("prompt", 1234); metrics.record_cache("llm_response", hit=True)
+#
+# Environment:
+#   METRICS_LOG   path of the rotating log once enable_file_log() is called (default
+#                 metrics.log, "off" disables it)
+#   METRICS_PORT  if set, serve Prometheus text format on http://0.0.0.0:<port>/metrics
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+METRICS_LOG_PATH = "metrics.log"
+BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_lock = threading.Lock()
+_durations = {}                      # stage -> [count, total seconds, bucket counts]
+_counters = defaultdict(float)       # (metric, labels tuple) -> value
+_run = threading.local()
+_logger = None
+_log_enabled = False
+_log_path = None
+
+
+# --- 1. LOG ---
+# Off unless an entry point turns it on (the app page, batch_match.py), so library
+# use (tests, benchmarks, scripts) never writes a log file
+def _get_logger():
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger("inclusive_job_matcher.metrics")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            logger.addHandler(logging.NullHandler())
+        _logger = logger
+    return _logger
+
+
+def _set_handler(handler):
+    global _log_enabled
+    logger = _get_logger()
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+        old.close()
+    logger.addHandler(handler)
+    _log_enabled = not isinstance(handler, logging.NullHandler)
+
+
+def enable_file_log(path=None):
+    # Idempotent; path defaults to METRICS_LOG (or metrics.log), "off" leaves logging off.
+    # Returns whether the log is on. One process per file: the rotating handler is not
+    # safe to share across processes.
+    global _log_path
+    path = path or os.environ.get("METRICS_LOG", METRICS_LOG_PATH)
+    with _lock:
+        if path == "off" or path == _log_path:
+            return path != "off"
+        from logging.handlers import RotatingFileHandler  # pulls in socket/pickle; first use only
+
+        handler = RotatingFileHandler(path, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _set_handler(handler)
+        _log_path = path
+    return True
+
+
+def log_to_queue(log_queue):
+    # Worker processes: hand events to the parent (see listen_to_queue) instead of
+    # writing a log file of their own
+    from logging.handlers import QueueHandler
+
+    global _log_path
+    _set_handler(QueueHandler(log_queue))
+    _log_path = None
+
+
+def listen_to_queue(log_queue):
+    # Parent side of log_to_queue: writes worker events through this process's log
+    # handler; call stop() on the returned listener once the workers are done
+    from logging.handlers import QueueListener
+
+    listener = QueueListener(log_queue, *_get_logger().handlers)
+    listener.start()
+    return listener
+
+
+def _log(event):
+    if not _log_enabled:
+        return
+    event["ts"] = round(time.time(), 3)
+    run = getattr(_run, "current", None)
+    if run is not None:
+        event["run"] = run["id"]
+    _get_logger().info(json.dumps(event))
+
+
+# --- 2. RECORDING ---
+def start_run(name):
+    # Begin a new per-run breakdown for the calling thread (one Streamlit script run)
+    _run.current = {"id": f"{name}-{time.time_ns()}", "name": name, "spans": [], "counters": defaultdict(float)}
+
+
+def current_run():
+    return getattr(_run, "current", None)
+
+
+def observe(stage, seconds):
+    with _lock:
+        entry = _durations.setdefault(stage, [0, 0.0, [0] * len(BUCKETS_SECONDS)])
+        entry[0] += 1
+        entry[1] += seconds
+        for i, bound in enumerate(BUCKETS_SECONDS):
+            if seconds <= bound:
+                entry[2][i] += 1
+    run = current_run()
+    if run is not None:
+        run["spans"].append((stage, seconds * 1000))
+    _log({"type": "span", "stage": stage, "ms": round(seconds * 1000, 3)})
+
+
+@contextlib.contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def timed(stage):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def increment(metric, value=1, **labels):
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] += value
+    run = current_run()
+    if run is not None:
+        run["counters"][key] += value
+
+
+def record_tokens(kind, count):
+    increment("tokens_total", count, kind=kind)
+    _log({"type": "tokens", "kind": kind, "count": count})
+
+
+def record_cache(cache, hit):
+    result = "hit" if hit else "miss"
+    increment("cache_requests_total", cache=cache, result=result)
+    _log({"type": "cache", "cache": cache, "result": result})
+
+
+def cache_hit_rate(cache, counters=None):
+    counters = _counters if counters is None else counters
+    hits = counters.get(("cache_requests_total", (("cache", cache), ("result", "hit"))), 0)
+    misses = counters.get(("cache_requests_total", (("cache", cache), ("result", "miss"))), 0)
+    return hits / (hits + misses) if hits + misses else None
+
+
+# --- 3. PROMETHEUS ---
+def _labels(pairs):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def render_prometheus(prefix="ijm"):
+    lines = [f"# TYPE {prefix}_stage_duration_seconds histogram"]
+    with _lock:
+        for stage, (count, total, buckets) in sorted(_durations.items()):
+            for bound, n in zip(BUCKETS_SECONDS, buckets):
+                lines.append(f'{prefix}_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {n}')
+            lines.append(f'{prefix}_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+        typed = set()
+        for (metric, labels), value in sorted(_counters.items()):
+            if metric not in typed:
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                typed.add(metric)
+            lines.append(f"{prefix}_{metric}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+
+
+def start_metrics_server(port=None):
+    # Idempotent; a no-op unless a port is given or METRICS_PORT is set.
+    # http.server is only imported when the endpoint is enabled (it is slow to import).
+    global _server
+    port = port or os.environ.get("METRICS_PORT")
+    if not port or _server is not None:
+        return _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", int(port)), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
+
+
+# --- 4. DEBUG PANEL ---
+def render_debug_panel():
+    import streamlit as st
+
+    run = current_run()
+    if run is None:
+        return
+    # Repeated spans (e.g. one per streamed chunk) are summed, in first-seen order
+    totals = {}
+    for stage, ms in run["spans"]:
+        calls, total = totals.get(stage, (0, 0.0))
+        totals[stage] = (calls + 1, total + ms)
+    with st.sidebar.expander("🛠️ Performance (this run)", expanded=True):
+        for stage, (calls, total) in totals.items():
+            suffix = f" ({calls} calls)" if calls > 1 else ""
+            st.write(f"- {stage}: {total:,.1f} ms{suffix}")
+        for (metric, labels), value in sorted(run["counters"].items()):
+            st.caption(f"{metric}{_labels(labels)} = {value:g}")
+        for cache in ("llm_response", "ranking"):
+            rate = cache_hit_rate(cache)
+            if rate is not None:
+                st.caption(f"{cache} cache hit rate (process): {rate:.0%}")
@@ -1,5 +1,7 @@
 import streamlit as st
 
+import job_store
+
 st.title("🧩 Inclusive Job Matcher – User Profile")
 st.markdown("Please complete the form below to receive personalized job recommendations.")
 
@@ -88,6 +90,14 @@ with st.form("user_profile_form"):
     preferred_role = st.text_input("4.4 Preferred Role (e.g., Software Engineer, Data Analyst, Cashier)",
                                    value=profile.get("preferred_role", ""))
 
+    # Only offered once listings for several metros are sharded (python job_store.py build)
+    available_regions = job_store.available_regions()
+    regions = []
+    if len(available_regions) > 1:
+        regions = st.multiselect("4.5 Which metro area(s) should we search? (leave empty for all)",
+                                 available_regions,
+                                 default=[r for r in profile.get("regions", []) if r in available_regions])
+
     # Section 5: Resume/Recommendations
     st.markdown("### 5. Job Recommendations & Resume Assistance")
     want_resume = st.radio("5.1 Generate a personalized resume?", ["Yes", "No"],
@@ -133,6 +143,7 @@ if submit:
             "schedule": schedule,
             "experience_level": experience_level,
             "preferred_role": preferred_role,
+            "regions": regions,
             "want_resume": want_resume,
             "want_recommendations": want_recommendations,
             "tts": st.session_state.get("tts", False)
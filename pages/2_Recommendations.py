@@ -1,211 +1,259 @@
 import streamlit as st
-import pandas as pd
-import google.generativeai as genai
-from langchain_utils import speak_text, add_to_memory
-import re
+import uuid
+import metrics
 
 st.title("🔍 Your AI-Powered Job Matches")
+metrics.start_run("recommendations")
+metrics.enable_file_log()       # JSON lines to METRICS_LOG (default metrics.log)
+metrics.start_metrics_server()  # Prometheus text on METRICS_PORT, if set
 
-@st.cache_data
-def load_data():
-    return pd.read_excel("accessible_jobs_chicago_cursor.xlsx")
-
-def build_prompt(profile, job_listings):
-    user_info = f"""
-Name: {profile['name']}
-Disability: {', '.join(profile['disability'])}
-Education: {profile['education']}
-Skills: {profile['skills']}
-Work Setup Preference: {profile['work_setup']}
-Accommodations Needed: {', '.join(profile['accommodations'])}
-Schedule: {profile['schedule']}
-"""
-
-    listings_text = "\n\n".join(
-        f"Job Title: {row['Job Title']}\nCompany Info: {row.get('Company Info', 'N/A')}\nDescription: {row['Job Description']}\nLink: [Apply here]({row['Job Link']})"
-        for _, row in job_listings.iterrows()
-    )
-
-    prompt = f"""
-You are a job recommendation assistant that helps people with disabilities find inclusive, accessible, and meaningful employment opportunities based on their background and preferences.
-
-Using the profile below, recommend real jobs that best match their skills, work setup preferences, schedule, and accommodation needs.
-
-🔎 Core Principles:
-- Prioritize **entry-level** or **trainable roles** unless the user's education and experience suggest readiness for more advanced positions.
-- Tailor recommendations to align with the user's **listed disabilities and required accommodations**. Consider accessibility needs such as remote options, screen reader compatibility, or non-verbal communication.
-- Avoid recommending jobs that inherently conflict with the user's accessibility requirements — unless the job explicitly includes accommodations.
-- Respect the user's **preferred role** and **skillset**, but offer alternatives if a better match exists based on their profile.
-
-💡 Matching Tips:
-- If the user has technical skills (e.g., Python, SQL), suggest relevant **junior tech roles**.
-- If the user has customer service skills, suggest **chat-based**, **remote**, or **inclusive support roles**.
-- If the user has limited formal skills or education, suggest **trainable**, **entry-level**, or **supported employment** opportunities.
-
-🛑 DO NOT:
-- Make up job titles, companies, or links.
-- Recommend inaccessible roles without clearly noted accommodations.
-
-✅ DO:
-- Use actual job listings provided below.
-- Be thoughtful and inclusive in your reasoning.
-- Provide variety but always justify why each job fits.
-
----
-
-👤 User Profile:
-{user_info}
-
-🧾 Job Listings ({len(job_listings)} total):
-{listings_text}
-
----
-
-🎯 Return the **top 10 job matches** that best fit the user’s profile. For each job, include:
-1. **Job Title + Company**
-2. **Short Company Overview**
-3. **Job Description Summary**
-4. **Why this job is a good match** (focus on technical + accessibility fit)
-5. **Application Link** using markdown `[Apply here](URL)`
-
----
-
-💬 Then, include an **Interview Advice Card** with tips tailored to the user's background, disability, and role goals.
-"""
-    return prompt
-
-# --- MAIN LOGIC ---
+# --- PRECONDITIONS (checked before the heavy imports below) ---
 if "profile" not in st.session_state:
     st.warning("⚠️ Please complete your profile first.")
     st.stop()
 
 profile = st.session_state["profile"]
+st.session_state.setdefault("session_id", uuid.uuid4().hex)
 
 if profile.get("want_recommendations", "Yes") == "No":
     st.info("ℹ️ You opted out of job recommendations.")
     st.stop()
 
+with metrics.span("imports"):
+    from llm_client import get_llm_client
+    from langchain_utils import speak_text, add_to_memory, get_recommendation_output_spec
+    from tts_worker import get_speech_worker
+    from matcher import JobMatcher
+    from llm_cache import ResponseCache, make_cache_key
+    from recommendation_parser import StreamingCardParser, StructuredCardParser, recommendation_response_schema
+    from prompt_builder import build_prompt, estimate_tokens, PROMPT_VERSION
+    import job_summaries
+    import inclusivity_scores
+    import ingest
+    import job_store
+    import reranker
+    from feedback_store import FeedbackLog
+
+MODEL_NAME = "models/gemini-1.5-flash-latest"
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_k": 40,
+    "top_p": 0.85,
+    "max_output_tokens": 2048,
+}
+STREAM_RESPONSES = True
+# "json": schema-constrained JSON parsed object by object; "markdown": legacy card layout
+RESPONSE_FORMAT = "json"
+if RESPONSE_FORMAT == "json":
+    GENERATION_CONFIG["response_mime_type"] = "application/json"
+INPUT_TOKEN_BUDGET = 12000
+
+# Keyed by snapshot version: a snapshot published by ingest.py is picked up on the next rerun
+# (and by the inclusivity score / re-ranker model versions, which matchers load with them)
+@st.cache_resource(max_entries=2)
+def load_matcher(version, scores_version=None, model_version=None):
+    # Warm engine: job index, precompiled patterns, keyword + semantic indexes
+    if version is None:
+        return JobMatcher.from_index()
+    return ingest.load_matcher(version)
+
+@st.cache_resource(max_entries=2)
+def load_shard_store(version, scores_version=None, model_version=None):
+    # Multi-metro deployments: shards are loaded lazily and queried in parallel
+    return job_store.ShardedJobStore(version=version)
+
+@st.cache_resource(max_entries=2)
+def load_job_summaries(version, dataset_version, _jobs):
+    # _jobs: the loaded matcher's job index (not hashed; dataset_version keys it)
+    if version is None:
+        return job_summaries.load_summaries(_jobs)
+    return ingest.load_summaries(version)
+
+@st.cache_resource
+def load_response_cache():
+    return ResponseCache()
+
+@st.cache_resource
+def load_feedback_log():
+    # Buffered; flushed once per script run (see the end of the page)
+    return FeedbackLog()
+
+# --- MAIN LOGIC ---
 # Text-to-Speech Toggle
 tts_enabled = st.toggle("🔊 Enable Text-to-Speech", value=profile.get("tts", False))
 profile["tts"] = tts_enabled
 st.session_state["profile"] = profile
-
-# Load and clean jobs
-jobs_df = load_data()
-jobs_df['Job Title'] = jobs_df['Job Title'].fillna("")
-jobs_df['Job Description'] = jobs_df['Job Description'].fillna("")
-
-# 🧼 Deduplicate by Job Title + Company Name
-if "Company Name" in jobs_df.columns:
-    jobs_df = jobs_df.drop_duplicates(subset=["Job Title", "Company Name"]).reset_index(drop=True)
-
-# 🎓 Filter out jobs requiring degrees beyond user's qualification
-education = profile.get("education", "").lower()
-if any(level in education for level in ["high school", "secondary", "ged", "diploma", "associate"]):
-    jobs_df = jobs_df[~jobs_df["Job Description"].str.lower().str.contains("bachelor|master")].reset_index(drop=True)
-
-
-# Filter out senior-level jobs
-senior_keywords = ["manager", "senior", "director", "vp", "lead"]
-mask = ~jobs_df['Job Title'].str.contains('|'.join(senior_keywords), case=False, na=False)
-
-# Convert skill list to lowercase string
-skill_string = " ".join(profile.get("skills", [])).lower()
-
-# Skill-based filtering logic
-if any(word in skill_string for word in ["python", "java", "sql", "software", "developer", "engineer"]):
-    keyword_filter = jobs_df['Job Title'].str.contains('software|developer|engineer', case=False, na=False)
-    jobs_df = jobs_df[mask & keyword_filter]
-elif "cashier" in profile["preferred_role"].lower() or any(skill in skill_string for skill in ["pos", "cash handling", "customer service"]):
-    cashier_filter = jobs_df['Job Title'].str.contains('cashier|clerk|associate|grocery', case=False, na=False)
-    jobs_df = jobs_df[mask & cashier_filter]
-elif profile["disability"] and "vision" in profile["disability"][0].lower() and "remote" in [w.lower() for w in profile["work_setup"]]:
-    if "customer service" in profile["preferred_role"].lower():
-        filter_keywords = "customer|support|chat|accessibility|remote|assistive|reader"
+tts = get_speech_worker() if tts_enabled else None
+
+# Filter, then rank by keyword relevance and local semantic similarity
+# (memoized per profile): only the closest candidates are sent to Gemini
+with metrics.span("load_matcher"):
+    snapshot_version = ingest.current_version()
+    shard_version = job_store.current_version()
+    # Shards built from an older snapshot are set aside (not hot reloaded) until they are rebuilt
+    if shard_version and not job_store.is_current(shard_version, snapshot_version):
+        shard_version = None
+    scores_version = inclusivity_scores.scores_version()
+    model_version = reranker.model_version()
+    if shard_version:
+        matcher = load_shard_store(shard_version, scores_version, model_version)
     else:
-        filter_keywords = "screen reader|qa|data entry|accessibility"
-    vision_mask = jobs_df['Job Title'].str.contains(filter_keywords, case=False, na=False) | \
-                  jobs_df['Job Description'].str.contains(filter_keywords, case=False, na=False)
-    jobs_df = jobs_df[mask & vision_mask]
-else:
-    jobs_df = jobs_df[mask]
-
-# Add relevance score based on skill matching
-def compute_relevance(job_title, job_desc, profile_keywords):
-    text = f"{job_title} {job_desc}".lower()
-    return sum(1 for word in profile_keywords if word in text)
+        matcher = load_matcher(snapshot_version, scores_version, model_version)
 
-profile_keywords = skill_string.split()
-jobs_df["RelevanceScore"] = jobs_df.apply(
-    lambda row: compute_relevance(row["Job Title"], row["Job Description"], profile_keywords),
-    axis=1
-)
-jobs_df = jobs_df.sort_values("RelevanceScore", ascending=False)
+# Offline inclusivity scores (python inclusivity_scores.py), once they have been computed
+if scores_version is not None:
+    with st.expander("🌈 Inclusivity score"):
+        profile["min_inclusivity"] = st.slider("Only show listings scoring at least (0 = any)", min_value=0,
+                                               max_value=10, value=profile.get("min_inclusivity", 0))
+        profile["rank_by_inclusivity"] = st.checkbox("Rank the most inclusive listings first",
+                                                     value=profile.get("rank_by_inclusivity", False))
 
 # Slider for number of jobs to pass to Gemini
-job_limit = st.slider("How many jobs should I consider for matching?", min_value=10, max_value=100, step=10, value=50)
-top_jobs = jobs_df.head(job_limit)
-st.caption(f"📌 Considering {len(top_jobs)} jobs out of {len(jobs_df)} after filtering and ranking by relevance.")
-
-# Run Gemini with hyperparameters
-genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-model = genai.GenerativeModel("models/gemini-1.5-flash-latest")
-response = model.generate_content(
-    build_prompt(profile, top_jobs),
-    generation_config=genai.types.GenerationConfig(
-        temperature=0.7,
-        top_k=40,
-        top_p=0.85,
-        max_output_tokens=2048
-    )
-).text
-add_to_memory(profile["name"], response)
-
-# Split response into job section + interview tips
-split_match = re.split(r"(?=💬 Interview Advice Card)", response, maxsplit=1)
-job_section = split_match[0].strip()
-interview_section = split_match[1].strip() if len(split_match) > 1 else ""
-
-st.session_state["job_recommendations"] = job_section
+job_limit = st.slider("How many jobs should I consider for matching?", min_value=10, max_value=100, step=10,
+                      value=20)
+with metrics.span("recommend"):
+    top_jobs = matcher.recommend(profile, job_limit)
+if top_jobs.empty:
+    st.info("ℹ️ No listings match your work setup and requirements yet. Try adding more work setup options in your profile.")
+    st.stop()
+st.caption(f"📌 Considering {len(top_jobs)} jobs out of {matcher.candidate_count(profile)} after filtering and ranking by similarity to your profile.")
 
-# Extract job matches for resume generation
-job_matches = re.findall(r"### 📌 (.*?) at (.*?)\n\n\*\*Company Overview:\*\* (.*?)\n\n\*\*Job Description:\*\* (.*?)\n\n\*\*Why this is a good fit:\*\* (.*?)\n\n\*\*Application Link:\*\* \[Apply here\]\((.*?)\)", job_section, re.DOTALL)
-st.session_state["job_matches"] = [
-    {
-        "Job Title": title,
-        "Company": company,
-        "Company Info": overview,
-        "Job Description": desc,
-        "Why Fit": why,
-        "Job Link": link
-    }
-    for title, company, overview, desc, why, link in job_matches
-]
-
-# Feedback tracking
+# Feedback tracking, keyed by job id and persisted to the feedback event log (reranker.py trains on it)
 if "job_feedback" not in st.session_state:
     st.session_state["job_feedback"] = {}
 
 if "applied_jobs" not in st.session_state:
     st.session_state["applied_jobs"] = []
 
-# Render Job Cards with feedback + applied tracking
-st.subheader("📄 Tailored Job Recommendations")
-for i, block in enumerate(job_section.split("---")):
-    block = block.strip()
-    if block:
-        st.markdown(f"""
-        <div style="padding: 20px; margin-bottom: 20px; border-radius: 10px; background-color: #f9f9fb; border-left: 5px solid #4a90e2;">
-        {block}
-        </div>
-        """, unsafe_allow_html=True)
-
-        feedback = st.radio(f"🤔 Was this recommendation helpful?", ["👍 Yes", "👎 No", "Maybe"], key=f"feedback_{i}")
-        st.session_state["job_feedback"][f"job_{i}"] = feedback
+FEEDBACK_EVENTS = {"👍 Yes": "helpful", "👎 No": "not_helpful", "Maybe": "maybe"}
+feedback_log = load_feedback_log()
+candidates = top_jobs.drop_duplicates("JobId").set_index("JobId", drop=False)
+
+def record_event(job_id, event, position):
+    if job_id in candidates.index:
+        feedback_log.record(profile, candidates.loc[job_id], event, position=position,
+                            session_id=st.session_state["session_id"])
+
+def on_feedback(job_id, position):
+    feedback = st.session_state[f"feedback_{position}_{job_id}"]
+    st.session_state["job_feedback"][job_id] = feedback
+    record_event(job_id, FEEDBACK_EVENTS[feedback], position)
+
+def on_applied(job_id, position):
+    if job_id not in st.session_state["applied_jobs"]:
+        st.session_state["applied_jobs"].append(job_id)
+        record_event(job_id, "applied", position)
+
+# Render a Job Card with feedback + applied tracking
+def render_job_card(i, block, match):
+    st.markdown(f"""
+    <div style="padding: 20px; margin-bottom: 20px; border-radius: 10px; background-color: #f9f9fb; border-left: 5px solid #4a90e2;">
+    {block}
+    </div>
+    """, unsafe_allow_html=True)
+
+    job_id = match["Job ID"] if match is not None and match["Job ID"] else f"job_{i}"
+    st.radio(f"🤔 Was this recommendation helpful?", list(FEEDBACK_EVENTS), index=None, key=f"feedback_{i}_{job_id}",
+             on_change=on_feedback, args=(job_id, i))
+
+    st.button(f"✅ Mark as Applied", key=f"applied_{i}_{job_id}", on_click=on_applied, args=(job_id, i))
+    if job_id in st.session_state["applied_jobs"]:
+        st.success("Marked as applied!")
+
+scored_jobs = top_jobs[top_jobs["InclusivityScore"].notna()]
+inclusivity_by_id = dict(zip(scored_jobs["JobId"], zip(scored_jobs["InclusivityScore"], scored_jobs["InclusivityReason"])))
+
+def add_summary(block, match):
+    # Join the precomputed summary + company overview (and inclusivity score) into a compact card
+    if shard_version:
+        found = matcher.lookup(match["Job ID"])
+    else:
+        found = job_summaries.lookup(load_job_summaries(snapshot_version, matcher.version, matcher.jobs), match["Job ID"])
+    if found is None:
+        return block
+    summary, overview = found
+    match["Company Info"], match["Job Description"] = overview, summary
+    heading, _, rest = block.partition("\n")
+    details = f"**Company Overview:** {overview}\n\n**Job Description:** {summary}"
+    if match["Job ID"] in inclusivity_by_id:
+        score, reason = inclusivity_by_id[match["Job ID"]]
+        details += f"\n\n**Inclusivity Score:** {score:g}/10 — {reason}"
+    return f"{heading}\n\n{details}\n{rest}"
+
+def render_cards(cards):
+    for block, match in cards:
+        if match is not None and match["Job ID"]:
+            block = add_summary(block, match)
+        render_job_card(len(rendered_cards), block, match)
+        rendered_cards.append(block)
+        if tts_enabled:
+            audio_segments.append(speak_text(block))  # start synthesis while the rest is still streaming
 
-        if st.button(f"✅ Mark as Applied", key=f"applied_{i}"):
-            st.session_state["applied_jobs"].append(f"job_{i}")
-            st.success("Marked as applied!")
+st.subheader("📄 Tailored Job Recommendations")
+if RESPONSE_FORMAT == "json":
+    parser = StructuredCardParser(listings=top_jobs)
+    GENERATION_CONFIG["response_schema"] = recommendation_response_schema(top_jobs["JobId"].tolist())
+else:
+    parser = StreamingCardParser()
+rendered_cards = []
+audio_segments = []   # audio file per rendered card, submitted once as each card renders
+
+# Run Gemini with hyperparameters (reuse cached answer for an identical request)
+response_cache = load_response_cache()
+cache_key = make_cache_key(profile, top_jobs["JobId"].tolist(), MODEL_NAME, GENERATION_CONFIG,
+                           namespace=f"recommendations:v{PROMPT_VERSION}:{RESPONSE_FORMAT}")
+with metrics.span("response_cache"):
+    response = response_cache.get(cache_key)
+cache_miss = response is None
+metrics.record_cache("llm_response", not cache_miss)
+if cache_miss:
+    llm = get_llm_client(st.secrets["GEMINI_API_KEY"])
+    with metrics.span("build_prompt"):
+        structured_spec = get_recommendation_output_spec() if RESPONSE_FORMAT == "json" else None
+        prompt, prompt_stats = build_prompt(profile, top_jobs, input_budget=INPUT_TOKEN_BUDGET,
+                                            summaries_precomputed=True, structured_spec=structured_spec)
+    st.session_state["prompt_stats"] = prompt_stats
+    metrics.record_tokens("prompt", prompt_stats["prompt_tokens"])
+    if prompt_stats["dropped_jobs"]:
+        st.caption(f"✂️ Only the top {prompt_stats['jobs']} jobs fit in the request; consider a lower job count.")
+    if STREAM_RESPONSES:
+        # Render each job card as soon as its block is complete
+        chunks = []
+        with st.spinner("Finding your matches..."), metrics.span("gemini_stream"):
+            for chunk in llm.stream_sync(prompt, MODEL_NAME, GENERATION_CONFIG):
+                chunks.append(chunk)
+                with metrics.span("parse"):
+                    cards = parser.feed(chunk)
+                with metrics.span("render_cards"):
+                    render_cards(cards)
+        response = "".join(chunks)
+    else:
+        with metrics.span("gemini"):
+            response = llm.generate_sync(prompt, MODEL_NAME, GENERATION_CONFIG)
+        with metrics.span("parse"):
+            cards = parser.feed(response)
+        render_cards(cards)
+    metrics.record_tokens("response", estimate_tokens(response))
+else:
+    with metrics.span("parse"):
+        cards = parser.feed(response)
+    render_cards(cards)
+render_cards(parser.close())
+if cache_miss:
+    # Only cache answers that parsed cleanly, so a truncated one is regenerated next time
+    if not getattr(parser, "errors", None):
+        response_cache.set(cache_key, response)
+    add_to_memory(profile["name"], response, session_id=st.session_state["session_id"])
+parse_errors = getattr(parser, "errors", [])
+if parse_errors:
+    metrics.increment("parse_errors_total", len(parse_errors))
+    st.caption(f"⚠️ Part of the response could not be read ({parse_errors[0]}); showing the recommendations that were complete.")
+
+# Job section + interview tips, and job matches for resume generation
+job_section = parser.job_section
+interview_section = parser.interview_section
+st.session_state["job_recommendations"] = job_section
+st.session_state["job_matches"] = parser.job_matches
 
 # Interview Advice Card
 if interview_section:
@@ -217,6 +265,29 @@ if interview_section:
         </div>
         """, unsafe_allow_html=True)
 
+# 🔊 Audio: one segment per job card, synthesized in the background and shown as it becomes ready
+def audio_pending(paths):
+    return any(not tts.is_ready(path) and not tts.error(path) for path in paths)
+
+def render_audio_segments(paths):
+    # Re-rendered in place on each tick (no app rerun, which would re-run the whole page);
+    # the timer is only set while segments are pending, so it stops with the next page run
+    ready = [path for path in paths if tts.is_ready(path)]
+    for path in ready:
+        st.audio(path)
+    failed = [tts.error(path) for path in paths if tts.error(path)]
+    if failed:
+        st.caption(f"⚠️ Audio unavailable: {failed[0]}")
+    elif len(ready) < len(paths):
+        st.caption(f"🔊 Preparing audio… {len(ready)} of {len(paths)} segments ready.")
+
 if tts_enabled:
-    speak_text(response)
+    segments = audio_segments + ([speak_text(interview_section)] if interview_section else [])
+    st.fragment(render_audio_segments, run_every=2 if audio_pending(segments) else None)(segments)
+
+# Optional timing breakdown for this run
+if st.sidebar.checkbox("🛠️ Show performance debug panel", key="show_metrics"):
+    metrics.render_debug_panel()
 
+# One batched write of this run's feedback events
+feedback_log.flush()
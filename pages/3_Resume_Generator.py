@@ -1,36 +1,50 @@
 import streamlit as st
-import pandas as pd
-import google.generativeai as genai
-from fpdf import FPDF
-from langchain_utils import speak_text
 
 st.title("📄 Personalized Resume Generator")
 
-# ✅ Check preconditions
+# ✅ Check preconditions (before importing the resume pipeline)
 if "profile" not in st.session_state or "job_matches" not in st.session_state:
     st.warning("⚠️ Please complete your profile and view job recommendations first.")
     st.stop()
 
+from pdf_render import resume_filename, tailored_resume_filename, zip_resumes
+from resume_builder import build_resume_context, make_resume_handler, make_tailored_resume_handler
+from task_queue import TaskQueue, QUEUED, RUNNING, DONE
+
+# Worker threads, i.e. the cap on resumes (and Gemini requests) in flight at once
+MAX_PARALLEL_RESUMES = 4
+MAX_TAILORED_RESUMES = 10
+POLL_SECONDS = 2
+STATUS_COLUMNS = ("status", "progress", "error")   # polled without the stored resumes
+
+def poll_interval(pending):
+    # Fragments re-run on a timer only while a task is still queued or running
+    return POLL_SECONDS if pending else None
+
+@st.cache_resource
+def load_task_queue():
+    api_key = st.secrets["GEMINI_API_KEY"]
+    return TaskQueue({"resume": make_resume_handler(api_key),
+                      "tailored_resume": make_tailored_resume_handler(api_key)},
+                     workers=MAX_PARALLEL_RESUMES)
+
 profile = st.session_state["profile"]
 job_matches = st.session_state["job_matches"]
-
-# ✅ Function to sanitize text for PDF (remove unsupported unicode)
-def sanitize_for_pdf(text):
-    replacements = {
-        '–': '-',  # en dash
-        '—': '-',  # em dash
-        '“': '"', '”': '"',  # smart quotes
-        '‘': "'", '’': "'",  # smart apostrophes
-        '•': '-',  # bullet point
-        '…': '...',  # ellipsis
-    }
-    for original, replacement in replacements.items():
-        text = text.replace(original, replacement)
-    return text
+tasks = load_task_queue()
 
 # ✅ Resume Form
 st.markdown("### ✏️ Please provide more details for resume tailoring:")
+mode = st.radio("What should I write?", ["One resume for all my matches", "A tailored resume for each selected job"],
+                horizontal=True)
+tailored = mode.startswith("A tailored")
+job_labels = [f"{job['Job Title']} at {job['Company']}" for job in job_matches]
 with st.form("resume_form"):
+    selected_jobs = []
+    if tailored:
+        selected_jobs = st.multiselect(f"🎯 Jobs to tailor a resume for (up to {MAX_TAILORED_RESUMES})",
+                                       list(range(len(job_matches))), default=list(range(min(5, len(job_matches)))),
+                                       format_func=lambda i: job_labels[i], max_selections=MAX_TAILORED_RESUMES)
+
     education = st.text_area("🎓 Education (e.g., Degree, School, Years)", "")
     experience = st.text_area("💼 Past Work Experience (bullets or summary)", "")
     certifications = st.text_area("📜 Certifications (Optional)", "")
@@ -38,71 +52,119 @@ with st.form("resume_form"):
     linkedin = st.text_input("🔗 LinkedIn Profile URL (Optional)", "")
     summary = st.text_area("🧠 Professional Summary (Optional)", "")
 
-    submit = st.form_submit_button("🪄 Generate Resume")
+    submit = st.form_submit_button("🪄 Generate Resumes" if tailored else "🪄 Generate Resume")
 
-# ✅ Generate Gemini-Powered Resume
+# ✅ Generate Gemini-Powered Resume(s) in the background
 if submit:
-    genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-    model = genai.GenerativeModel("models/gemini-1.5-flash-latest")
-
-    jobs_text = "\n\n".join([
-        f"- {job['Job Title']} at {job['Company']}\n  Description: {job['Job Description']}"
-        for job in job_matches
-    ])
-
-    resume_prompt = f"""
-You are a resume writer. Based on the user's info and the job descriptions, write an ATS-friendly professional resume in plain text with clean formatting.
-
-USER INFO:
-Name: {profile['name']}
-Email: {profile['email']}
-Phone: {profile['phone']}
-Disability: {', '.join(profile['disability'])}
-Education: {education}
-Experience: {experience}
-Skills: {profile['skills']}
-Certifications: {certifications}
-Projects: {projects}
-LinkedIn: {linkedin}
-Summary: {summary}
-
-MATCHED JOBS:
-{jobs_text}
-
-Format:
-- Start with name and contact
-- Summary section (if given)
-- Skills (bullets or comma-separated)
-- Education
-- Work Experience (tailored to job descriptions)
-- Certifications and Projects (optional)
-Keep resume under 1 page. Use concise bullet points. Avoid repetition. Return clean plain text only.
-"""
-
-    response = model.generate_content(resume_prompt).text
-    st.success("✅ Resume generated successfully!")
-
-    # Display resume preview
-    st.text_area("🧾 Preview Resume", response, height=400)
-
-    # Convert to PDF with sanitized text
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=10)
-    pdf.set_left_margin(10)
-    pdf.set_right_margin(10)
-    pdf.set_font("Arial", size=10)
-
-    for line in sanitize_for_pdf(response).split("\n"):
-        pdf.multi_cell(0, 7, line)
-
-    pdf_output = f"{profile['name'].replace(' ', '_')}_resume.pdf"
-    pdf.output(pdf_output)
-
-    with open(pdf_output, "rb") as file:
+    details = {
+        "education": education,
+        "experience": experience,
+        "certifications": certifications,
+        "projects": projects,
+        "linkedin": linkedin,
+        "summary": summary,
+    }
+    if not tailored:
+        st.session_state["resume_task_id"] = tasks.submit("resume", {
+            "profile": profile,
+            "job_matches": job_matches,
+            "details": details,
+        })
+    elif not selected_jobs:
+        st.warning("⚠️ Please select at least one job to tailor a resume for.")
+    else:
+        # One task per job, queued together: they run in parallel on the queue's workers
+        context = build_resume_context(profile, details)
+        st.session_state["tailored_results"], st.session_state["tailored_zip"] = {}, None
+        st.session_state["tailored_tasks"] = [
+            (tasks.submit("tailored_resume", {"context": context, "job": job_matches[i]}), job_matches[i])
+            for i in selected_jobs
+        ]
+
+def is_pending(task):
+    return task is not None and task["status"] in (QUEUED, RUNNING)
+
+# ✅ Poll the task until the resume is ready (no timer once it is done or failed)
+def show_resume_task(task_id, polling):
+    task = tasks.get(task_id)
+    if polling and not is_pending(task):
+        st.rerun()  # finished: render once more without the timer
+    if task is None:
+        st.warning("⚠️ This resume request is no longer available. Please generate it again.")
+    elif task["status"] in (QUEUED, RUNNING):
+        st.info(f"⏳ {task['progress']}…")
+    elif task["status"] == DONE:
+        st.success("✅ Resume generated successfully!")
+
+        # Display resume preview
+        st.text_area("🧾 Preview Resume", task["result_text"], height=400)
+
         st.download_button(
             label="📥 Download Resume as PDF",
-            data=file,
-            file_name=pdf_output,
+            data=task["result_pdf"],
+            file_name=resume_filename(profile['name']),
             mime="application/pdf"
         )
+    else:
+        st.error(f"❌ Resume generation failed: {task['error']}")
+        if st.button("🔁 Retry"):
+            tasks.retry(task_id)
+            st.rerun()  # restart polling
+
+def count_pending(found):
+    return sum(task["status"] in (QUEUED, RUNNING) for task in found.values())
+
+# ✅ Tailored resumes appear one by one as they finish; the zip is offered once none are pending
+def show_tailored_tasks(tailored_tasks, polling):
+    found = tasks.get_many([task_id for task_id, _ in tailored_tasks], STATUS_COLUMNS)
+    pending = count_pending(found)
+    if polling and not pending:
+        st.rerun()  # everything finished: render once more without the timer
+
+    # Each finished resume is read from the queue once and kept for the session
+    results = st.session_state.setdefault("tailored_results", {})
+    newly_done = [task_id for task_id, task in found.items() if task["status"] == DONE and task_id not in results]
+    if newly_done:
+        results.update({task_id: (task["result_text"], task["result_pdf"])
+                        for task_id, task in tasks.get_many(newly_done).items()})
+
+    finished = []
+    for task_id, job in tailored_tasks:
+        label = f"{job['Job Title']} at {job['Company']}"
+        task = found.get(task_id)
+        if task_id in results:
+            text, pdf = results[task_id]
+            filename = tailored_resume_filename(profile["name"], job)
+            finished.append((filename, pdf))
+            with st.expander(f"✅ {label}"):
+                st.text_area("🧾 Preview Resume", text, height=300, key=f"preview_{task_id}")
+                st.download_button("📥 Download PDF", data=pdf, file_name=filename,
+                                   mime="application/pdf", key=f"download_{task_id}")
+        elif task is None:
+            st.warning(f"⚠️ {label}: this request is no longer available. Please generate it again.")
+        elif task["status"] in (QUEUED, RUNNING):
+            st.info(f"⏳ {label}: {task['progress']}…")
+        else:
+            st.error(f"❌ {label}: resume generation failed: {task['error']}")
+            if st.button("🔁 Retry", key=f"retry_{task_id}"):
+                tasks.retry(task_id)
+                st.rerun()  # restart polling
+
+    st.caption(f"{len(finished)} of {len(tailored_tasks)} tailored resumes ready.")
+    if finished and not pending:
+        # Zipped once per set of finished resumes, not on every rerun
+        zip_key = tuple(filename for filename, _ in finished)
+        if not st.session_state.get("tailored_zip") or st.session_state["tailored_zip"][0] != zip_key:
+            st.session_state["tailored_zip"] = (zip_key, zip_resumes(finished))
+        st.download_button(f"📦 Download all {len(finished)} resumes (.zip)", data=st.session_state["tailored_zip"][1],
+                           file_name=resume_filename(profile["name"]).replace(".pdf", "s.zip"),
+                           mime="application/zip", key="download_all")
+
+if tailored and "tailored_tasks" in st.session_state:
+    tailored_tasks = st.session_state["tailored_tasks"]
+    pending = count_pending(tasks.get_many([task_id for task_id, _ in tailored_tasks], STATUS_COLUMNS))
+    st.fragment(show_tailored_tasks, run_every=poll_interval(pending))(tailored_tasks, bool(pending))
+elif not tailored and "resume_task_id" in st.session_state:
+    resume_task_id = st.session_state["resume_task_id"]
+    pending = is_pending(tasks.get_many([resume_task_id], STATUS_COLUMNS).get(resume_task_id))
+    st.fragment(show_resume_task, run_every=poll_interval(pending))(resume_task_id, pending)
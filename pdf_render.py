@@ -0,0 +1,89 @@
+# pdf_render.py
+#
+# In-memory resume PDF rendering. Nothing touches the server's disk: the PDF is
+# built straight to bytes and cached by resume text, so re-rendering the same
+# resume (e.g. on a rerun or second download) is free. Per-job resumes are bundled
+# into an in-memory zip.
+
+import hashlib
+import io
+import re
+import zipfile
+from collections import OrderedDict
+import threading
+
+# Core PDF fonts only cover latin-1; map common typographic characters in one pass
+PDF_TRANSLATION = str.maketrans({
+    '–': '-',  # en dash
+    '—': '-',  # em dash
+    '“': '"', '”': '"',  # smart quotes
+    '‘': "'", '’': "'",  # smart apostrophes
+    '•': '-',  # bullet point
+    '…': '...',  # ellipsis
+})
+
+PDF_CACHE_SIZE = 64
+
+
+def sanitize_for_pdf(text):
+    # Anything else outside latin-1 becomes "?" instead of crashing the render
+    return text.translate(PDF_TRANSLATION).encode("latin-1", "replace").decode("latin-1")
+
+
+def _new_document():
+    from fpdf import FPDF  # imported on first render, not at page load
+
+    # Built-in Arial needs no font files, so a fresh document is cheap to set up
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=10)
+    pdf.set_left_margin(10)
+    pdf.set_right_margin(10)
+    pdf.set_font("Arial", size=10)
+    return pdf
+
+
+def _render(text):
+    pdf = _new_document()
+    pdf.multi_cell(0, 7, sanitize_for_pdf(text))
+    output = pdf.output(dest="S")
+    if isinstance(output, str):  # PyFPDF returns a latin-1 string, fpdf2 a bytearray
+        output = output.encode("latin-1")
+    return bytes(output)
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def render_resume_pdf(text):
+    # PDF bytes for the resume text, served from an LRU cache keyed by text hash
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    pdf_bytes = _render(text)
+    with _cache_lock:
+        _cache[key] = pdf_bytes
+        while len(_cache) > PDF_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return pdf_bytes
+
+
+def resume_filename(name):
+    return f"{name.replace(' ', '_')}_resume.pdf"
+
+
+def tailored_resume_filename(name, job):
+    target = re.sub(r"[^A-Za-z0-9]+", "_", f"{job['Job Title']} {job['Company']}").strip("_")
+    return f"{name.replace(' ', '_')}_{target}_resume.pdf"
+
+
+def zip_resumes(files):
+    # files: [(filename, pdf bytes)] -> zip archive bytes (PDFs are already compressed)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for filename, pdf_bytes in files:
+            archive.writestr(filename, pdf_bytes)
+    return buffer.getvalue()
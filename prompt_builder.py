@@ -0,0 +1,220 @@
+# prompt_builder.py
+#
+# Assembles the recommendation prompt under a token budget. Listing text is built
+# with vectorized string operations and each description (and company info, unless
+# summaries are precomputed and it is left out) is truncated to a shared cap so the
+# whole prompt fits the configured input budget. When even the minimum cap doesn't
+# fit, the lowest-ranked listings are left out.
+
+import numpy as np
+import pandas as pd
+
+CHARS_PER_TOKEN = 4               # rough average for English text
+DEFAULT_INPUT_BUDGET = 12000      # tokens for the whole prompt
+MIN_DESCRIPTION_TOKENS = 40       # never cut a description shorter than this (fewer listings are sent instead)
+TRUNCATION_MARK = " …"
+
+# Bumped whenever the prompt wording changes, so cached answers are not reused
+PROMPT_VERSION = "3"
+
+FULL_OUTPUT_SPEC = """🎯 Return the **top 10 job matches** that best fit the user’s profile. For each job, include:
+1. **Job Title + Company**
+2. **Short Company Overview**
+3. **Job Description Summary**
+4. **Why this job is a good match** (focus on technical + accessibility fit)
+5. **Application Link** using markdown `[Apply here](URL)`
+"""
+
+# Used when job summaries and company overviews are precomputed (see job_summaries.py)
+REASONING_OUTPUT_SPEC = """🎯 Return the **top 10 job matches** that best fit the user’s profile. The job summary and company overview are shown to the user separately, so do not repeat them. Separate jobs with `---` and use exactly this layout for each:
+
+### 📌 <Job Title> at <Company>
+
+**Job ID:** <Job ID from the listing>
+
+**Why this is a good fit:** <focus on technical + accessibility fit>
+
+**Application Link:** [Apply here](<URL>)
+"""
+
+# Closing instruction for the markdown modes; the structured (JSON) mode asks for
+# interview advice inside its schema instead
+INTERVIEW_CLOSING = """---
+
+💬 Then, include an **Interview Advice Card** with tips tailored to the user's background, disability, and role goals.
+"""
+
+
+# --- 1. TOKEN ESTIMATES ---
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_tokens_series(texts):
+    return texts.str.len().to_numpy() // CHARS_PER_TOKEN + 1
+
+
+def description_cap(desc_tokens, budget):
+    # Largest per-description cap whose total stays within budget (None if all fit)
+    if desc_tokens.sum() <= budget:
+        return None
+    lo, hi = 0, int(desc_tokens.max())
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if np.minimum(desc_tokens, mid).sum() <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return max(lo, MIN_DESCRIPTION_TOKENS)
+
+
+def listings_that_fit(fixed_tokens, text_tokens, budget):
+    # Largest k such that the first k listings fit with their texts at the minimum cap;
+    # fixed_tokens(k) is the prompt size for k listings with empty texts
+    floor = np.minimum(text_tokens, MIN_DESCRIPTION_TOKENS).sum(axis=1).cumsum()
+    lo, hi = 1, len(floor)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fixed_tokens(mid) + floor[mid - 1] <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def truncate_descriptions(descriptions, cap_tokens):
+    if cap_tokens is None:
+        return descriptions, 0
+    cap_chars = cap_tokens * CHARS_PER_TOKEN
+    too_long = descriptions.str.len() > cap_chars
+    cut = descriptions[too_long].str.slice(0, cap_chars).str.rsplit(" ", n=1).str[0] + TRUNCATION_MARK
+    return descriptions.where(~too_long, cut), int(too_long.sum())
+
+
+# --- 2. PROMPT ASSEMBLY ---
+def build_user_info(profile):
+    return f"""
+Name: {profile['name']}
+Disability: {', '.join(profile['disability'])}
+Education: {profile['education']}
+Skills: {profile['skills']}
+Work Setup Preference: {profile['work_setup']}
+Accommodations Needed: {', '.join(profile['accommodations'])}
+Schedule: {profile['schedule']}
+"""
+
+
+def company_info(job_listings):
+    if "Company Info" in job_listings.columns:
+        return job_listings["Company Info"].fillna("N/A")
+    return pd.Series("N/A", index=job_listings.index)
+
+
+def build_listings_text(job_listings, descriptions=None, include_ids=False, company_infos=None,
+                        include_company_info=True):
+    if descriptions is None:
+        descriptions = job_listings["Job Description"]
+    if company_infos is None:
+        company_infos = company_info(job_listings)
+    listings = "Job Title: " + job_listings["Job Title"]
+    if include_ids:
+        listings = "Job ID: " + job_listings["JobId"] + "\n" + listings + "\nCompany: " + job_listings["Company Name"]
+    if include_company_info:
+        listings = listings + "\nCompany Info: " + company_infos
+    listings = (listings
+                + "\nDescription: " + descriptions
+                + "\nLink: [Apply here](" + job_listings["Job Link"] + ")")
+    return "\n\n".join(listings)
+
+
+def render_prompt(user_info, job_count, listings_text, output_spec=FULL_OUTPUT_SPEC, closing=INTERVIEW_CLOSING):
+    return f"""
+You are a job recommendation assistant that helps people with disabilities find inclusive, accessible, and meaningful employment opportunities based on their background and preferences.
+
+Using the profile below, recommend real jobs that best match their skills, work setup preferences, schedule, and accommodation needs.
+
+🔎 Core Principles:
+- Prioritize **entry-level** or **trainable roles** unless the user's education and experience suggest readiness for more advanced positions.
+- Tailor recommendations to align with the user's **listed disabilities and required accommodations**. Consider accessibility needs such as remote options, screen reader compatibility, or non-verbal communication.
+- Avoid recommending jobs that inherently conflict with the user's accessibility requirements — unless the job explicitly includes accommodations.
+- Respect the user's **preferred role** and **skillset**, but offer alternatives if a better match exists based on their profile.
+
+💡 Matching Tips:
+- If the user has technical skills (e.g., Python, SQL), suggest relevant **junior tech roles**.
+- If the user has customer service skills, suggest **chat-based**, **remote**, or **inclusive support roles**.
+- If the user has limited formal skills or education, suggest **trainable**, **entry-level**, or **supported employment** opportunities.
+
+🛑 DO NOT:
+- Make up job titles, companies, or links.
+- Recommend inaccessible roles without clearly noted accommodations.
+
+✅ DO:
+- Use actual job listings provided below.
+- Be thoughtful and inclusive in your reasoning.
+- Provide variety but always justify why each job fits.
+
+---
+
+👤 User Profile:
+{user_info}
+
+🧾 Job Listings ({job_count} total):
+{listings_text}
+
+---
+
+{output_spec}
+{closing}"""
+
+
+def build_prompt(profile, job_listings, input_budget=DEFAULT_INPUT_BUDGET, summaries_precomputed=False,
+                 structured_spec=None):
+    # Returns (prompt, stats); stats records the prompt size for this request.
+    # With summaries_precomputed the model is only asked for the "why it fits" reasoning
+    # and company info is left out (the overview is shown to the user separately).
+    # structured_spec replaces the markdown layout with a JSON output spec (job IDs are included).
+    # job_listings must be best first: listings that don't fit are dropped from the end.
+    user_info = build_user_info(profile)
+    output_spec = REASONING_OUTPUT_SPEC if summaries_precomputed else FULL_OUTPUT_SPEC
+    closing = INTERVIEW_CLOSING
+    if structured_spec is not None:
+        output_spec, closing = structured_spec, ""
+    include_ids = summaries_precomputed or structured_spec is not None
+    include_company_info = not summaries_precomputed
+
+    def assemble(listings, descs, infos):
+        listings_text = build_listings_text(listings, descs, include_ids=include_ids, company_infos=infos,
+                                            include_company_info=include_company_info)
+        return render_prompt(user_info, len(listings), listings_text, output_spec, closing)
+
+    def fixed_tokens(k):
+        # Everything except the budgeted texts of the first k listings
+        empty = pd.Series("", index=job_listings.index[:k])
+        return estimate_tokens(assemble(job_listings.iloc[:k], empty, empty))
+
+    # Budgeted texts, one column per field: descriptions, plus company info when it is sent
+    texts = [job_listings["Job Description"]] + ([company_info(job_listings)] if include_company_info else [])
+    text_tokens = np.column_stack([estimate_tokens_series(t) for t in texts])
+    available = len(job_listings)
+    if available and fixed_tokens(available) + np.minimum(text_tokens, MIN_DESCRIPTION_TOKENS).sum() > input_budget:
+        kept = listings_that_fit(fixed_tokens, text_tokens, input_budget)
+        job_listings, texts, text_tokens = job_listings.iloc[:kept], [t.iloc[:kept] for t in texts], text_tokens[:kept]
+
+    # Descriptions and company info share one cap over what is left after the fixed cost
+    cap = description_cap(text_tokens.ravel(), max(input_budget - fixed_tokens(len(job_listings)), 0))
+    truncated = 0
+    for i, text in enumerate(texts):
+        texts[i], count = truncate_descriptions(text, cap)
+        truncated += count
+
+    prompt = assemble(job_listings, texts[0], texts[1] if include_company_info else None)
+    stats = {
+        "jobs": len(job_listings),
+        "dropped_jobs": available - len(job_listings),
+        "input_budget": input_budget,
+        "prompt_chars": len(prompt),
+        "prompt_tokens": estimate_tokens(prompt),
+        "description_cap_tokens": cap,
+        "truncated_descriptions": truncated,
+    }
+    return prompt, stats
@@ -0,0 +1,287 @@
+# recommendation_parser.py
+#
+# Parses Gemini recommendation output into job cards, job_matches entries and the
+# interview advice section. StreamingCardParser accepts the response chunk by chunk
+# and hands back each card as soon as its "---" separator arrives.
+# StructuredCardParser does the same for the JSON output mode: each match object is
+# decoded and validated once, as soon as it is complete, and rendered into a card.
+# Matches must name one of the listings sent; title, company and link come from that
+# listing, never from the model.
+
+import json
+import re
+
+INTERVIEW_MARKER = "💬 Interview Advice Card"
+CARD_SEPARATOR = "---"
+
+JOB_MATCH_PATTERN = re.compile(
+    r"### 📌 (.*?) at (.*?)\n\n\*\*Company Overview:\*\* (.*?)\n\n\*\*Job Description:\*\* (.*?)\n\n"
+    r"\*\*Why this is a good fit:\*\* (.*?)\n\n\*\*Application Link:\*\* \[Apply here\]\((.*?)\)",
+    re.DOTALL,
+)
+
+
+# Compact layout used when summaries are precomputed (prompt_builder.REASONING_OUTPUT_SPEC)
+REASONING_MATCH_PATTERN = re.compile(
+    r"### 📌 (.*?) at (.*?)\n\n\*\*Job ID:\*\* `?(\w+)`?\s*\n\n"
+    r"\*\*Why this is a good fit:\*\* (.*?)\n\n\*\*Application Link:\*\* \[Apply here\]\((.*?)\)",
+    re.DOTALL,
+)
+
+
+def parse_card(block):
+    # job_matches entry for one card, or None if the card doesn't follow the layout
+    match = JOB_MATCH_PATTERN.search(block)
+    if match is not None:
+        title, company, overview, desc, why, link = match.groups()
+        job_id = None
+    else:
+        match = REASONING_MATCH_PATTERN.search(block)
+        if match is None:
+            return None
+        title, company, job_id, why, link = match.groups()
+        overview, desc = "", ""
+    return {
+        "Job ID": job_id,
+        "Job Title": title,
+        "Company": company,
+        "Company Info": overview,
+        "Job Description": desc,
+        "Why Fit": why,
+        "Job Link": link
+    }
+
+
+class StreamingCardParser:
+    def __init__(self):
+        self._pending = ""
+        self._job_parts = []
+        self._interview_parts = []
+        self.in_interview = False
+        self.closed = False
+        self.cards = []
+        self.job_matches = []
+
+    def _emit(self, blocks):
+        # (card text, job_matches entry or None) for each non-empty block
+        emitted = []
+        for block in blocks:
+            block = block.strip()
+            if block:
+                self.cards.append(block)
+                match = parse_card(block)
+                if match is not None:
+                    self.job_matches.append(match)
+                emitted.append((block, match))
+        return emitted
+
+    def feed(self, chunk):
+        # Returns the cards completed by this chunk as (card text, match) pairs
+        if self.in_interview:
+            self._interview_parts.append(chunk)
+            return []
+
+        self._pending += chunk
+        marker_pos = self._pending.find(INTERVIEW_MARKER)
+        if marker_pos != -1:
+            self._interview_parts.append(self._pending[marker_pos:])
+            self._pending = self._pending[:marker_pos]
+            self.in_interview = True
+
+        *complete, self._pending = self._pending.split(CARD_SEPARATOR)
+        self._job_parts.extend(complete)
+        emitted = self._emit(complete)
+        if self.in_interview:
+            emitted += self.close()
+        return emitted
+
+    def close(self):
+        # Flush the trailing card once the stream has ended (or the interview card began)
+        if self.closed:
+            return []
+        self.closed = True
+        last, self._pending = self._pending, ""
+        self._job_parts.append(last)
+        return self._emit([last])
+
+    @property
+    def job_section(self):
+        return CARD_SEPARATOR.join(self._job_parts).strip()
+
+    @property
+    def interview_section(self):
+        return "".join(self._interview_parts).strip()
+
+
+# --- STRUCTURED (JSON) MODE ---
+# Keys of each object in the "matches" array (see langchain_utils.recommendation_schemas)
+MATCH_FIELDS = {"job_id": "Job ID", "job_title": "Job Title", "company": "Company",
+                "why_fit": "Why Fit", "job_link": "Job Link"}
+MATCHES_KEY_PATTERN = re.compile(r'"matches"\s*:\s*\[')
+INTERVIEW_KEY_PATTERN = re.compile(r'"interview_advice"\s*:\s*')
+JSON_FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def recommendation_response_schema(job_ids=None):
+    # Gemini response_schema for the JSON mode; job_id is limited to the listings sent
+    job_id = {"type": "STRING"}
+    if job_ids is not None:
+        job_id["enum"] = [str(i) for i in job_ids]
+    match = {"type": "OBJECT", "properties": {field: {"type": "STRING"} for field in MATCH_FIELDS},
+             "required": list(MATCH_FIELDS)}
+    match["properties"]["job_id"] = job_id
+    return {"type": "OBJECT",
+            "properties": {"matches": {"type": "ARRAY", "items": match}, "interview_advice": {"type": "STRING"}},
+            "required": ["matches", "interview_advice"]}
+
+
+def listing_fields(listings):
+    # JobId -> the match fields taken from our own data (a ranked-candidates frame)
+    return {job_id: {"job_title": title, "company": company, "job_link": link}
+            for job_id, title, company, link in zip(listings["JobId"], listings["Job Title"],
+                                                    listings["Company Name"], listings["Job Link"])}
+
+
+def validate_match(obj, listings=None):
+    # (job_matches entry, None) for one decoded match object, or (None, reason) if it is
+    # unusable. With listings (listing_fields), unknown job ids are rejected and the
+    # title, company and link of known ones come from the listing.
+    if not isinstance(obj, dict):
+        return None, "not an object"
+    values = {field: str(obj.get(field) or "").strip() for field in MATCH_FIELDS}
+    if listings is not None:
+        if values["job_id"] not in listings:
+            return None, f"unknown job id {values['job_id']!r}"
+        values.update({field: str(value or "").strip() for field, value in listings[values["job_id"]].items()})
+    if not values["job_title"] or not values["company"]:
+        return None, "missing job title or company"
+    if not values["job_link"].startswith(("http://", "https://")):
+        values["job_link"] = ""
+    match = {MATCH_FIELDS[field]: value for field, value in values.items()}
+    match["Job ID"] = match["Job ID"] or None
+    match["Company Info"], match["Job Description"] = "", ""
+    return match, None
+
+
+def advice_text(value):
+    # Interview advice as markdown (the model sometimes returns a list of tips)
+    if isinstance(value, list):
+        return "\n".join(f"- {tip}" for tip in value)
+    return str(value or "").strip()
+
+
+def render_match(match):
+    # Same card layout as the markdown mode, so summaries/TTS/feedback work unchanged
+    card = f"### 📌 {match['Job Title']} at {match['Company']}\n\n**Why this is a good fit:** {match['Why Fit']}"
+    if match["Job Link"]:
+        card += f"\n\n**Application Link:** [Apply here]({match['Job Link']})"
+    return card
+
+
+class StructuredCardParser:
+    # Same interface as StreamingCardParser. The buffer is scanned once: a cursor moves
+    # past each complete match object, so a truncated response still yields every match
+    # that arrived in full.
+    def __init__(self, listings=None):
+        # listings: the ranked candidates sent to the model (see listing_fields)
+        self.listings = listing_fields(listings) if listings is not None else None
+        self._seen = set()
+        self._buffer = ""
+        self._cursor = None          # position inside the "matches" array, once found
+        self._matches_done = False
+        self._interview = ""
+        self._decoder = json.JSONDecoder()
+        self.closed = False
+        self.cards = []
+        self.job_matches = []
+        self.errors = []
+
+    def _accept(self, obj):
+        match, reason = validate_match(obj, self.listings)
+        if match is not None and match["Job ID"] and match["Job ID"] in self._seen:
+            match, reason = None, f"repeated job id {match['Job ID']!r}"
+        if match is None:
+            self.errors.append(f"invalid match ({reason}): {str(obj)[:80]}")
+            return []
+        self._seen.add(match["Job ID"])
+        block = render_match(match)
+        self.cards.append(block)
+        self.job_matches.append(match)
+        return [(block, match)]
+
+    def _scan(self):
+        emitted = []
+        if self._cursor is None:
+            found = MATCHES_KEY_PATTERN.search(self._buffer)
+            if found is None:
+                return emitted
+            self._cursor = found.end()
+        while not self._matches_done:
+            while self._cursor < len(self._buffer) and self._buffer[self._cursor] in " \t\r\n,":
+                self._cursor += 1
+            if self._cursor >= len(self._buffer):
+                break
+            if self._buffer[self._cursor] == "]":
+                self._matches_done = True
+                break
+            try:
+                obj, end = self._decoder.raw_decode(self._buffer, self._cursor)
+            except json.JSONDecodeError:
+                break  # incomplete object: wait for more text
+            self._cursor = end
+            emitted += self._accept(obj)
+        return emitted
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        return self._scan()
+
+    def close(self):
+        if self.closed:
+            return []
+        self.closed = True
+        emitted = self._scan()
+        if self._cursor is None:
+            # No "matches" array seen while scanning: last resort, decode the whole text
+            try:
+                data = json.loads(JSON_FENCE_PATTERN.sub("", self._buffer))
+            except json.JSONDecodeError:
+                data = None
+            matches = data.get("matches") if isinstance(data, dict) else data
+            if not isinstance(matches, list):
+                self.errors.append("no matches list in response")
+                matches = []
+            for obj in matches:
+                emitted += self._accept(obj)
+        elif not self._matches_done:
+            self.errors.append("response ended before the matches list was complete")
+
+        found = INTERVIEW_KEY_PATTERN.search(self._buffer)
+        if found is not None:
+            try:
+                self._interview = advice_text(self._decoder.raw_decode(self._buffer, found.end())[0])
+            except json.JSONDecodeError:
+                self.errors.append("interview advice was cut off")
+        return emitted
+
+    @property
+    def job_section(self):
+        return f"\n\n{CARD_SEPARATOR}\n\n".join(self.cards)
+
+    @property
+    def interview_section(self):
+        return self._interview
+
+
+def parse_response(response):
+    parser = StreamingCardParser()
+    parser.feed(response)
+    parser.close()
+    return parser
+
+
+def parse_structured_response(response, listings=None):
+    parser = StructuredCardParser(listings)
+    parser.feed(response)
+    parser.close()
+    return parser
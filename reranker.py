@@ -0,0 +1,246 @@
+# reranker.py
+#
+# Lightweight learned re-ranker trained offline from the feedback event log
+# (feedback_store.py). A logistic model over the ranking signals (semantic, keyword,
+# accommodation and inclusivity scores) plus hashed profile-token x job-group cross
+# features, scored over all candidates with NumPy at ranking time. The model only nudges
+# the hand-set order: its probability is blended into the semantic score (see blend),
+# and a model is only saved when that order beats the baseline on held-out feedback.
+#
+#   python reranker.py train              # fit on feedback_events.sqlite3 -> reranker.npz
+#   python reranker.py train --min-events 20 --holdout 0.3
+
+import argparse
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+import job_index
+from feedback_store import FEEDBACK_DB_PATH, profile_features
+
+RERANKER_PATH = "reranker.npz"
+
+DENSE_FEATURES = ["SemanticScore", "LogRelevance", "AccessScore", "Inclusivity", "HasInclusivity"]
+# Job groups crossed with the profile tokens: role families, then accommodation tags
+JOB_GROUPS = [*job_index.ROLE_FAMILIES, *job_index.ACCESS_TAGS]
+CROSS_BUCKETS = 1 << 12
+
+# Event -> training label (the latest feedback per profile + job wins; "applied" always counts as 1)
+EVENT_LABELS = {"helpful": 1.0, "maybe": 0.5, "not_helpful": 0.0, "applied": 1.0}
+
+# How far the learned probability (0..1, centered) can move a candidate's semantic score.
+# Accommodations offered stay the leading sort key either way (matcher/filters.py).
+BLEND_WEIGHT = 0.2
+# A model is saved only if its order beats the baseline by this much on enough held-out pairs
+MIN_GAIN = 0.02
+MIN_HOLDOUT_PAIRS = 30
+
+
+# --- 1. FEATURES ---
+def dense_features(frame):
+    # Raw (unstandardized) dense features of ranked candidates, shape (n, len(DENSE_FEATURES))
+    if "InclusivityScore" in frame.columns:
+        inclusivity = frame["InclusivityScore"].to_numpy(dtype=float)
+    else:
+        inclusivity = np.full(len(frame), np.nan)
+    return np.column_stack([
+        frame["SemanticScore"].to_numpy(dtype=float),
+        np.log1p(frame["RelevanceScore"].to_numpy(dtype=float)),
+        frame["AccessScore"].to_numpy(dtype=float),
+        np.nan_to_num(inclusivity / 10, nan=0.0),
+        ~np.isnan(inclusivity),
+    ]).astype(float)
+
+
+def job_groups(frame):
+    # One bitset per candidate: bit i set when it belongs to JOB_GROUPS[i]
+    groups = np.zeros(len(frame), dtype=np.int64)
+    for i, flag in enumerate(job_index.ROLE_FAMILIES):
+        groups |= frame[flag].to_numpy(dtype=bool).astype(np.int64) << i
+    offset = len(job_index.ROLE_FAMILIES)
+    tags = frame["AccessTags"].to_numpy().astype(np.int64)
+    for i, bit in enumerate(job_index.ACCESS_BITS.values()):
+        groups |= ((tags & bit) != 0).astype(np.int64) << (offset + i)
+    return groups
+
+
+def cross_buckets(features):
+    # Hashed bucket of every (profile feature, job group) pair, shape (len(features), len(JOB_GROUPS))
+    pairs = [[zlib.crc32(f"{feature}|{group}".encode("utf-8")) for group in range(len(JOB_GROUPS))]
+             for feature in features]
+    return np.array(pairs, dtype=np.int64).reshape(len(features), len(JOB_GROUPS)) % CROSS_BUCKETS
+
+
+def _group_matrix(groups):
+    return ((np.asarray(groups)[:, None] >> np.arange(len(JOB_GROUPS))) & 1).astype(float)
+
+
+def _sigmoid(logits):
+    return 1 / (1 + np.exp(-logits))
+
+
+def blend(semantic, logits):
+    # Semantic score nudged by the learned probability; what the ranking sorts on
+    return semantic + BLEND_WEIGHT * (_sigmoid(logits) - 0.5)
+
+
+def ordering_key(dense, logits=None):
+    # One sortable value per example reproducing the served order from raw dense features:
+    # AccessScore, then the semantic score (blended when logits are given), then relevance
+    semantic = dense[:, 0] if logits is None else blend(dense[:, 0], logits)
+    return dense[:, 2] * 4 + semantic + dense[:, 1] * 1e-6
+
+
+def concordance(keys, labels, groups):
+    # Share of same-profile example pairs with different labels that keys order correctly
+    # (ties count half), and the number of such pairs
+    correct = total = 0.0
+    for members in groups:
+        k, y = keys[members], labels[members]
+        better = y[:, None] > y[None, :]
+        correct += ((k[:, None] > k[None, :]) & better).sum() + 0.5 * ((k[:, None] == k[None, :]) & better).sum()
+        total += better.sum()
+    return (correct / total if total else float("nan")), int(total)
+
+
+def _examples(events):
+    # One training example per profile + job, from its latest "applied" event if there is
+    # one, else its latest feedback: (labeled events, labels, raw dense features)
+    labeled = (events.assign(applied=events["event"] == "applied")
+               .sort_values(["applied", "id"])
+               .drop_duplicates(["profile_hash", "job_id"], keep="last")
+               .reset_index(drop=True))
+    labels = labeled["event"].map(EVENT_LABELS).to_numpy(dtype=float)
+    dense = np.array([json.loads(f) for f in labeled["features"]], dtype=float).reshape(len(labeled), -1)
+    return labeled, labels, dense
+
+
+def _cross_pairs(labeled):
+    # (example, bucket) pairs of the active cross features
+    groups = _group_matrix(labeled["job_groups"].to_numpy())
+    rows, buckets = [], []
+    for i, (features, group_row) in enumerate(zip(labeled["profile_features"], groups)):
+        active = np.flatnonzero(group_row)
+        table = cross_buckets(json.loads(features))
+        if len(table) and len(active):
+            cells = table[:, active].ravel()
+            rows.append(np.full(len(cells), i))
+            buckets.append(cells)
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    buckets = np.concatenate(buckets) if buckets else np.empty(0, dtype=np.int64)
+    return rows, buckets
+
+
+# --- 2. MODEL ---
+class Reranker:
+    def __init__(self, mean, std, dense_weights, cross_weights, bias, meta=None):
+        self.mean = mean
+        self.std = std
+        self.dense_weights = dense_weights
+        self.cross_weights = cross_weights
+        self.bias = bias
+        self.meta = meta or {}
+
+    def _logits(self, dense, groups, group_weights):
+        return (dense - self.mean) / self.std @ self.dense_weights + _group_matrix(groups) @ group_weights + self.bias
+
+    def score(self, frame, profile):
+        # Learned relevance logit of every candidate for this profile (higher is better)
+        group_weights = self.cross_weights[cross_buckets(profile_features(profile))].sum(axis=0)
+        return self._logits(dense_features(frame), job_groups(frame), group_weights)
+
+    def _example_logits(self, labeled, dense):
+        rows, buckets = _cross_pairs(labeled)
+        cross = np.bincount(rows, weights=self.cross_weights[buckets], minlength=len(labeled))
+        return (dense - self.mean) / self.std @ self.dense_weights + cross + self.bias
+
+    @classmethod
+    def fit(cls, events, l2=1e-2, epochs=300, learning_rate=0.5, holdout=0.3, seed=0):
+        # events: feedback_store.FeedbackLog.events(). A random share of the profiles is held
+        # out; meta reports how well the blended order and the baseline order rank their
+        # feedback (meta["beats_baseline"] gates saving in the CLI)
+        labeled, labels, dense = _examples(events)
+        profiles = labeled["profile_hash"].unique()
+        held = np.random.default_rng(seed).permutation(len(profiles))[:int(round(len(profiles) * holdout))]
+        test = labeled["profile_hash"].isin(profiles[held]).to_numpy()
+
+        model = cls._train(labeled[~test].reset_index(drop=True), labels[~test], dense[~test], l2, epochs,
+                           learning_rate)
+        test_labeled, test_labels, test_dense = labeled[test].reset_index(drop=True), labels[test], dense[test]
+        groups = test_labeled.groupby("profile_hash").indices.values()
+        learned, pairs = concordance(ordering_key(test_dense, model._example_logits(test_labeled, test_dense)),
+                                     test_labels, groups)
+        baseline, _ = concordance(ordering_key(test_dense), test_labels, groups)
+        model.meta.update({"events": len(events), "holdout_examples": int(test.sum()), "holdout_pairs": pairs,
+                           "holdout_concordance": float(learned), "baseline_concordance": float(baseline),
+                           "beats_baseline": bool(pairs >= MIN_HOLDOUT_PAIRS and learned >= baseline + MIN_GAIN)})
+        return model
+
+    @classmethod
+    def _train(cls, labeled, labels, dense, l2, epochs, learning_rate):
+        rows, buckets = _cross_pairs(labeled)
+        mean, std = dense.mean(axis=0), dense.std(axis=0) + 1e-6
+        x = (dense - mean) / std
+        w, c, b = np.zeros(x.shape[1]), np.zeros(CROSS_BUCKETS), 0.0
+        n = len(labels)
+        # Full-batch gradient descent on L2-regularized logistic loss (soft labels)
+        for _ in range(epochs):
+            logits = x @ w + np.bincount(rows, weights=c[buckets], minlength=n) + b
+            error = (_sigmoid(logits) - labels) / n
+            w -= learning_rate * (x.T @ error + l2 * w)
+            c -= learning_rate * (np.bincount(buckets, weights=error[rows], minlength=CROSS_BUCKETS) + l2 * c)
+            b -= learning_rate * error.sum()
+
+        probabilities = _sigmoid(x @ w + np.bincount(rows, weights=c[buckets], minlength=n) + b)
+        loss = -np.mean(labels * np.log(probabilities + 1e-9) + (1 - labels) * np.log(1 - probabilities + 1e-9))
+        meta = {"examples": n, "log_loss": float(loss), "trained_at": time.time()}
+        return cls(mean, std, w, c, b, meta)
+
+    def save(self, path=RERANKER_PATH):
+        np.savez(path, mean=self.mean, std=self.std, dense_weights=self.dense_weights,
+                 cross_weights=self.cross_weights, bias=self.bias, meta=json.dumps(self.meta))
+
+    @classmethod
+    def load(cls, path=RERANKER_PATH):
+        data = np.load(path)
+        return cls(data["mean"], data["std"], data["dense_weights"], data["cross_weights"], float(data["bias"]),
+                   json.loads(str(data["meta"])))
+
+
+def load_reranker(path=RERANKER_PATH):
+    # The trained model, or None until one has been trained
+    return Reranker.load(path) if os.path.exists(path) else None
+
+
+def model_version(path=RERANKER_PATH):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Train the learned re-ranker from the feedback event log.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    train_cmd = commands.add_parser("train")
+    train_cmd.add_argument("--events", default=FEEDBACK_DB_PATH)
+    train_cmd.add_argument("--dest", default=RERANKER_PATH)
+    train_cmd.add_argument("--min-events", type=int, default=50, help="Don't train on fewer labeled events")
+    train_cmd.add_argument("--holdout", type=float, default=0.3, help="Share of profiles held out for evaluation")
+    args = arg_parser.parse_args()
+
+    from feedback_store import FeedbackLog
+
+    events = FeedbackLog(args.events).events()
+    if len(events) < args.min_events:
+        raise SystemExit(f"Only {len(events)} feedback events (need {args.min_events}); not training.")
+    model = Reranker.fit(events, holdout=args.holdout)
+    meta = model.meta
+    print(f"Trained on {meta['examples']} examples ({meta['events']} events), training log loss "
+          f"{meta['log_loss']:.3f}; held-out pair order {meta['holdout_concordance']:.3f} vs baseline "
+          f"{meta['baseline_concordance']:.3f} ({meta['holdout_pairs']} pairs)")
+    if not meta["beats_baseline"]:
+        raise SystemExit(f"The learned order doesn't beat the baseline by {MIN_GAIN} on at least {MIN_HOLDOUT_PAIRS} "
+                         f"held-out pairs; {args.dest} not written.")
+    model.save(args.dest)
+    print(f"-> {args.dest}")
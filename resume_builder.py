@@ -0,0 +1,101 @@
+# resume_builder.py
+#
+# Resume prompt assembly and the background task handlers that turn a resume
+# request into plain text + PDF bytes (see task_queue.py): one resume for all job
+# matches, or one tailored resume per job. The user-info block is built once per
+# request and shared by every per-job prompt.
+
+import metrics
+from llm_client import get_llm_client
+from pdf_render import render_resume_pdf
+
+
+RESUME_FORMAT = """Format:
+- Start with name and contact
+- Summary section (if given)
+- Skills (bullets or comma-separated)
+- Education
+- Work Experience (tailored to job descriptions)
+- Certifications and Projects (optional)
+Keep resume under 1 page. Use concise bullet points. Avoid repetition. Return clean plain text only."""
+
+
+def job_text(job):
+    return f"- {job['Job Title']} at {job['Company']}\n  Description: {job['Job Description']}"
+
+
+def build_resume_context(profile, details):
+    # Shared user-info block; build once and reuse for every prompt of one request
+    return f"""USER INFO:
+Name: {profile['name']}
+Email: {profile['email']}
+Phone: {profile['phone']}
+Disability: {', '.join(profile['disability'])}
+Education: {details['education']}
+Experience: {details['experience']}
+Skills: {profile['skills']}
+Certifications: {details['certifications']}
+Projects: {details['projects']}
+LinkedIn: {details['linkedin']}
+Summary: {details['summary']}"""
+
+
+def build_resume_prompt(profile, details, job_matches, context=None):
+    context = context or build_resume_context(profile, details)
+    jobs_text = "\n\n".join(job_text(job) for job in job_matches)
+
+    return f"""
+You are a resume writer. Based on the user's info and the job descriptions, write an ATS-friendly professional resume in plain text with clean formatting.
+
+{context}
+
+MATCHED JOBS:
+{jobs_text}
+
+{RESUME_FORMAT}
+"""
+
+
+def build_tailored_prompt(context, job):
+    # One target job; context comes from build_resume_context
+    return f"""
+You are a resume writer. Based on the user's info and the target job below, write an ATS-friendly professional resume in plain text with clean formatting, tailored to this one job.
+
+{context}
+
+TARGET JOB:
+{job_text(job)}
+
+{RESUME_FORMAT}
+Lead with the skills and experience most relevant to the target job.
+"""
+
+
+def _generate(api_key, prompt, report_progress):
+    from prompt_builder import estimate_tokens  # pandas/NumPy only once a task runs
+
+    metrics.record_tokens("prompt", estimate_tokens(prompt))
+    with metrics.span("resume_gemini"):
+        text = get_llm_client(api_key).generate_sync(prompt)
+    metrics.record_tokens("response", estimate_tokens(text))
+    report_progress("Rendering PDF")
+    with metrics.span("render_pdf"):
+        pdf = render_resume_pdf(text)
+    return {"text": text, "pdf": pdf}
+
+
+def make_resume_handler(api_key):
+    def generate_resume(payload, report_progress):
+        report_progress("Writing your resume")
+        prompt = build_resume_prompt(payload["profile"], payload["details"], payload["job_matches"])
+        return _generate(api_key, prompt, report_progress)
+    return generate_resume
+
+
+def make_tailored_resume_handler(api_key):
+    # payload: {"context": build_resume_context(...), "job": one job_matches entry}. One task
+    # per job, so the queue's worker pool bounds how many run (and call Gemini) at once.
+    def generate_tailored_resume(payload, report_progress):
+        report_progress(f"Writing the resume for {payload['job']['Job Title']}")
+        return _generate(api_key, build_tailored_prompt(payload["context"], payload["job"]), report_progress)
+    return generate_tailored_resume
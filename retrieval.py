@@ -0,0 +1,243 @@
+# retrieval.py
+#
+# Local semantic pre-ranking before the LLM prompt. Jobs and profiles are embedded
+# CPU-only as TF-IDF vectors projected to a small dense space (random projection
+# keeps cosine similarity roughly intact). Job vectors are precomputed into a
+# memory-mapped .npy matrix and searched with batched cosine similarity. Each build
+# writes a new vectors file (job_vectors.<id>.npy); the meta file names the one that
+# goes with it, so replacing the meta swaps both at once.
+#
+#   python retrieval.py        # (re)build job_vectors.npy from the job index
+
+import contextlib
+import glob
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import job_index
+
+VECTORS_PATH = "job_vectors.npy"
+META_PATH = "job_vectors_meta.npz"
+KEEP_VECTORS_SECONDS = 600   # superseded vectors files are kept this long for workers still opening them
+
+TOKEN_PATTERN = r"[a-z0-9][a-z0-9+#]*"
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "of",
+    "on", "or", "our", "that", "the", "their", "this", "to", "we", "will", "with", "you", "your",
+}
+
+
+# --- 1. TOKENIZE ---
+def _term_frequencies(texts):
+    # (row position, term, tf) for every distinct term in every text
+    texts = pd.Series(list(texts), dtype=object).fillna("").str.lower()
+    tokens = texts.str.findall(TOKEN_PATTERN).explode().dropna()
+    tokens = tokens[~tokens.isin(STOPWORDS)]
+    pairs = pd.DataFrame({"row": tokens.index.to_numpy(), "term": tokens.to_numpy()})
+    return pairs.value_counts().reset_index(name="tf").sort_values("row", kind="stable")
+
+
+def job_texts(jobs_df):
+    return jobs_df["Job Title"] + " " + jobs_df["Job Title"] + " " + jobs_df["Job Description"]
+
+
+def profile_text(profile):
+    parts = [profile.get("preferred_role", "")] * 2
+    parts += profile.get("skills", []) + profile.get("accommodations", []) + profile.get("work_setup", [])
+    return " ".join(p for p in parts if p)
+
+
+@contextlib.contextmanager
+def _replacing(path):
+    # Write to a temp file and rename it over path when complete. Workers that memory-mapped
+    # the old file keep reading its (unlinked) inode; truncating it in place would crash them.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _new_vectors_path(vectors_path):
+    # job_vectors.npy -> job_vectors.<id>.npy, a file no reader knows about until the meta names it
+    stem, ext = os.path.splitext(vectors_path)
+    return f"{stem}.{uuid.uuid4().hex[:12]}{ext}"
+
+
+def _meta_vectors_path(meta, vectors_path):
+    # Vectors file named by the meta; metas written before that was recorded used vectors_path
+    if "vectors_file" not in meta:
+        return vectors_path
+    return os.path.join(os.path.dirname(vectors_path), str(meta["vectors_file"]))
+
+
+def _prune_vectors(vectors_path, meta_path, keep_seconds=KEEP_VECTORS_SECONDS):
+    # Remove vectors files the meta no longer names, once they are old enough that no
+    # reader that loaded the previous meta can still be about to open them
+    with np.load(meta_path, allow_pickle=True) as meta:
+        current = _meta_vectors_path(meta, vectors_path)
+    stem, ext = os.path.splitext(vectors_path)
+    for path in [vectors_path, *glob.glob(f"{glob.escape(stem)}.*{ext}")]:
+        try:
+            if path != current and time.time() - os.path.getmtime(path) > keep_seconds:
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+
+
+# --- 2. EMBEDDING MODEL ---
+class SemanticRetriever:
+    def __init__(self, vocab, idf, projection, job_vectors, version=None):
+        self.vocab = pd.Index(vocab)
+        self.idf = idf.astype(np.float32)
+        self.projection = projection.astype(np.float32)
+        self.job_vectors = job_vectors
+        self.version = version
+
+    @classmethod
+    def _fit(cls, tf, n_jobs, dim, max_features, min_df, seed):
+        doc_freq = tf["term"].value_counts()
+        doc_freq = doc_freq[doc_freq >= min_df].head(max_features)
+        vocab = doc_freq.index.to_numpy(dtype=object)
+        idf = np.log((1 + n_jobs) / (1 + doc_freq.to_numpy())) + 1
+        projection = np.random.default_rng(seed).standard_normal((len(vocab), dim)) / np.sqrt(dim)
+        return cls(vocab, idf, projection, None)
+
+    @classmethod
+    def fit(cls, jobs_df, dim=256, max_features=20000, min_df=2, seed=13):
+        # Model only (vocabulary, IDF, projection); embed job sets with updated()
+        return cls._fit(_term_frequencies(job_texts(jobs_df)), len(jobs_df), dim, max_features, min_df, seed)
+
+    @classmethod
+    def build(cls, jobs_df, vectors_path=VECTORS_PATH, meta_path=META_PATH,
+              dim=256, max_features=20000, min_df=2, seed=13):
+        n_jobs = len(jobs_df)
+        tf = _term_frequencies(job_texts(jobs_df))
+        retriever = cls._fit(tf, n_jobs, dim, max_features, min_df, seed)
+        retriever.version = job_index.dataset_version(jobs_df)
+        new_path = _new_vectors_path(vectors_path)
+        with _replacing(new_path) as tmp:
+            job_vectors = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(n_jobs, dim))
+            retriever._fill_vectors(job_vectors, tf)
+            job_vectors.flush()
+            del job_vectors
+
+        retriever._save_meta(meta_path, new_path)
+        _prune_vectors(vectors_path, meta_path)
+        retriever.job_vectors = np.load(new_path, mmap_mode="r")
+        return retriever
+
+    @classmethod
+    def load(cls, vectors_path=VECTORS_PATH, meta_path=META_PATH):
+        # The meta is read first: the vectors file it names is never modified afterwards
+        with np.load(meta_path, allow_pickle=True) as meta:
+            job_vectors = np.load(_meta_vectors_path(meta, vectors_path), mmap_mode="r")
+            return cls(meta["vocab"], meta["idf"], meta["projection"], job_vectors, str(meta["version"]))
+
+    def _save_meta(self, meta_path, vectors_path):
+        # Replacing the meta is what publishes the vectors file it names
+        with _replacing(meta_path) as tmp:
+            with open(tmp, "wb") as fh:
+                np.savez(fh, vocab=self.vocab.to_numpy(dtype=object), idf=self.idf, projection=self.projection,
+                         version=self.version, vectors_file=os.path.basename(vectors_path))
+
+    def _fill_vectors(self, out, tf, batch_rows=1000):
+        term_ids = self.vocab.get_indexer(tf["term"])
+        keep = term_ids >= 0
+        rows = tf["row"].to_numpy()[keep]
+        term_ids = term_ids[keep]
+        weights = ((1 + np.log(tf["tf"].to_numpy()[keep])) * self.idf[term_ids]).astype(np.float32)
+
+        out[:] = 0
+        for start in range(0, len(out), batch_rows):
+            lo, hi = np.searchsorted(rows, [start, start + batch_rows])
+            if lo == hi:
+                continue
+            contrib = weights[lo:hi, None] * self.projection[term_ids[lo:hi]]
+            batch_rows_ids = rows[lo:hi]
+            starts = np.flatnonzero(np.r_[True, batch_rows_ids[1:] != batch_rows_ids[:-1]])
+            out[batch_rows_ids[starts]] = np.add.reduceat(contrib, starts, axis=0)
+
+            block = out[start:start + batch_rows]
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            out[start:start + batch_rows] = block / np.where(norms == 0, 1, norms)
+
+    def updated(self, jobs_df, changed_positions, vectors_path, meta_path, batch_rows=50000):
+        # Vectors for jobs_df where only the rows at changed_positions (edited or appended)
+        # differ: unchanged rows are copied, only changed rows are embedded. The vocabulary,
+        # IDF and projection stay frozen; run a full build now and then to pick up new terms.
+        # On a model from fit() (no vectors yet) every changed row is embedded.
+        n_kept = 0 if self.job_vectors is None else min(len(self.job_vectors), len(jobs_df))
+        new_path = _new_vectors_path(vectors_path)
+        with _replacing(new_path) as tmp:
+            job_vectors = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32,
+                                                    shape=(len(jobs_df), self.projection.shape[1]))
+            for start in range(0, n_kept, batch_rows):
+                stop = min(start + batch_rows, n_kept)
+                job_vectors[start:stop] = self.job_vectors[start:stop]
+            changed_positions = np.asarray(changed_positions, dtype=np.int64)
+            for start in range(0, len(changed_positions), batch_rows):
+                rows = changed_positions[start:start + batch_rows]
+                job_vectors[rows] = self.embed(job_texts(jobs_df.iloc[rows]))
+            job_vectors.flush()
+            del job_vectors
+
+        updated = SemanticRetriever(self.vocab, self.idf, self.projection, np.load(new_path, mmap_mode="r"),
+                                    job_index.dataset_version(jobs_df))
+        updated._save_meta(meta_path, new_path)
+        _prune_vectors(vectors_path, meta_path)
+        return updated
+
+    def embed(self, texts):
+        texts = list(texts)
+        vectors = np.zeros((len(texts), self.projection.shape[1]), dtype=np.float32)
+        self._fill_vectors(vectors, _term_frequencies(texts))
+        return vectors
+
+    # --- 3. SEARCH ---
+    def similarity(self, query_vectors, candidates=None, batch_rows=50000):
+        # Cosine similarity (vectors are unit length) of each query against each candidate job
+        query_vectors = np.atleast_2d(query_vectors)
+        if candidates is None:
+            candidates = np.arange(len(self.job_vectors))
+        scores = np.empty((len(query_vectors), len(candidates)), dtype=np.float32)
+        for start in range(0, len(candidates), batch_rows):
+            chunk = self.job_vectors[candidates[start:start + batch_rows]]
+            scores[:, start:start + batch_rows] = query_vectors @ chunk.T
+        return scores
+
+    def top_k(self, query_vectors, k, candidates=None):
+        # (positions, scores) of the k most similar jobs per query, best first
+        scores = self.similarity(query_vectors, candidates)
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return np.empty((len(scores), 0), dtype=np.int64), np.empty((len(scores), 0), dtype=np.float32)
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        best = np.take_along_axis(part, order, axis=1)
+        positions = best if candidates is None else np.asarray(candidates)[best]
+        return positions, np.take_along_axis(scores, best, axis=1)
+
+
+def load_retriever(jobs_df, vectors_path=VECTORS_PATH, meta_path=META_PATH):
+    # Reuse the stored vectors unless the job index changed since they were built
+    if os.path.exists(meta_path):
+        try:
+            retriever = SemanticRetriever.load(vectors_path, meta_path)
+        except FileNotFoundError:
+            retriever = None  # vectors file already pruned
+        if retriever is not None and retriever.version == job_index.dataset_version(jobs_df):
+            return retriever
+    return SemanticRetriever.build(jobs_df, vectors_path, meta_path)
+
+
+if __name__ == "__main__":
+    built = SemanticRetriever.build(job_index.load_index())
+    print(f"Embedded {len(built.job_vectors)} jobs ({len(built.vocab)} terms) -> {built.job_vectors.filename}")
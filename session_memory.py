@@ -0,0 +1,141 @@
+# session_memory.py
+#
+# Per-session conversation memory with bounded retention. Each session keeps a
+# sliding window of recent messages under a byte budget; idle sessions are evicted
+# so memory use per worker stays flat. Backends are pluggable (in-process or SQLite).
+
+import contextlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+MEMORY_DB_PATH = "session_memory.sqlite3"
+
+
+def _clip(content, max_bytes):
+    encoded = content.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return content
+    return encoded[:max_bytes].decode("utf-8", errors="ignore") + " …"
+
+
+# --- 1. BACKENDS ---
+class InMemoryBackend:
+    def __init__(self, max_sessions=1000):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()   # session_id -> deque of (role, content), oldest session first
+        self._lock = threading.Lock()
+
+    def append(self, session_id, role, content):
+        with self._lock:
+            messages = self._sessions.pop(session_id, None) or deque()
+            messages.append((role, content))
+            self._sessions[session_id] = messages
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def messages(self, session_id):
+        with self._lock:
+            return list(self._sessions.get(session_id, ()))
+
+    def trim(self, session_id, keep):
+        # Keep only the newest `keep` messages
+        with self._lock:
+            messages = self._sessions.get(session_id)
+            while messages and len(messages) > keep:
+                messages.popleft()
+
+    def clear(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteBackend:
+    def __init__(self, path=MEMORY_DB_PATH, max_sessions=10000):
+        self.path = path
+        self.max_sessions = max_sessions
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(self, session_id, role, content):
+        with self._connect() as conn:
+            conn.execute("INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                         (session_id, role, content, time.time()))
+            # Evict the least recently active sessions beyond the cap
+            conn.execute("""
+                DELETE FROM messages WHERE session_id IN (
+                    SELECT session_id FROM messages GROUP BY session_id
+                    ORDER BY MAX(id) DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_sessions,))
+
+    def messages(self, session_id):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT role, content FROM messages WHERE session_id = ? ORDER BY id",
+                                (session_id,)).fetchall()
+        return [(role, content) for role, content in rows]
+
+    def trim(self, session_id, keep):
+        with self._connect() as conn:
+            conn.execute("""
+                DELETE FROM messages WHERE session_id = ? AND id NOT IN (
+                    SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?
+                )
+            """, (session_id, session_id, keep))
+
+    def clear(self, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+
+# --- 2. BOUNDED MEMORY ---
+class SessionMemory:
+    def __init__(self, backend=None, max_messages=10, max_bytes=32 * 1024, max_message_bytes=8 * 1024):
+        self.backend = backend or InMemoryBackend()
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.max_message_bytes = max_message_bytes
+
+    def add_message(self, session_id, role, content):
+        self.backend.append(session_id, role, _clip(content, self.max_message_bytes))
+        self._enforce_limits(session_id)
+
+    def add_exchange(self, session_id, user_input, ai_response):
+        self.add_message(session_id, "human", user_input)
+        self.add_message(session_id, "ai", ai_response)
+
+    def _enforce_limits(self, session_id):
+        messages = self.backend.messages(session_id)
+        keep = min(len(messages), self.max_messages)
+        total = sum(len(content.encode("utf-8")) for _, content in messages[-keep:]) if keep else 0
+        # Drop the oldest messages until the window fits the byte budget
+        while keep > 1 and total > self.max_bytes:
+            total -= len(messages[-keep][1].encode("utf-8"))
+            keep -= 1
+        if keep < len(messages):
+            self.backend.trim(session_id, keep)
+
+    def messages(self, session_id):
+        return self.backend.messages(session_id)
+
+    def clear(self, session_id):
+        self.backend.clear(session_id)
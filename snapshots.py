@@ -0,0 +1,52 @@
+# snapshots.py
+#
+# Versioned snapshot directories behind an atomically replaced CURRENT pointer,
+# shared by ingest.py (job data snapshots) and job_store.py (shard sets).
+# Standard library only, so pages can check for published data cheaply.
+
+import json
+import os
+import shutil
+
+POINTER_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+KEEP_SNAPSHOTS = 3
+
+
+def snapshot_dir(version, root):
+    return os.path.join(root, version)
+
+
+def current_version(root):
+    # Name of the published snapshot, or None before the first one
+    try:
+        with open(os.path.join(root, POINTER_FILE), encoding="utf-8") as fh:
+            return fh.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(version, root):
+    with open(os.path.join(snapshot_dir(version, root), MANIFEST_FILE), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def next_version(root):
+    numbers = [int(name[1:]) for name in os.listdir(root) if name.startswith("v") and name[1:].isdigit()]
+    return f"v{max(numbers, default=0) + 1:06d}"
+
+
+def publish(version, root):
+    tmp = os.path.join(root, f"{POINTER_FILE}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(version)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, os.path.join(root, POINTER_FILE))
+
+
+def prune(root, keep=KEEP_SNAPSHOTS):
+    # Older snapshots are kept for a while so workers still reading them are unaffected
+    versions = sorted(name for name in os.listdir(root) if name.startswith("v") and name[1:].isdigit())
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
@@ -0,0 +1,159 @@
+# task_queue.py
+#
+# SQLite-backed task queue with a local worker pool. Slow work (e.g. resume
+# generation) is submitted as a task, runs off the Streamlit script thread and
+# stores its result for later polling, so it survives page navigation. Finished
+# tasks hold profile details and resumes, so their payload is cleared on success and
+# finished tasks are deleted once they are older than the retention period.
+#
+#   tasks = TaskQueue(handlers={"resume": generate_resume})
+#   task_id = tasks.submit("resume", payload)
+#   tasks.get(task_id)   # {"status": "running", "progress": "...", ...}
+
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+TASKS_DB_PATH = "tasks.sqlite3"
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class TaskQueue:
+    def __init__(self, handlers, path=TASKS_DB_PATH, workers=2, max_attempts=3, poll_interval=0.5,
+                 stale_after=600, retention=24 * 3600, purge_interval=600):
+        # handlers: kind -> fn(payload, report_progress) returning {"text": ..., "pdf": bytes}
+        self.handlers = handlers
+        self.path = path
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._wakeup = threading.Event()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress TEXT,
+                    payload TEXT NOT NULL,
+                    result_text TEXT,
+                    result_pdf BLOB,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at)")
+            # Tasks left running by a crashed worker go back in the queue
+            conn.execute("UPDATE tasks SET status = ?, progress = 'Requeued' WHERE status = ? AND updated_at < ?",
+                         (QUEUED, RUNNING, time.time() - stale_after))
+        self.purge()
+
+        self._threads = [threading.Thread(target=self._work, name=f"task-worker-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # --- 1. CLIENT API ---
+    def submit(self, kind, payload):
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for task kind {kind!r}")
+        task_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO tasks (id, kind, status, progress, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'Waiting in queue', ?, ?, ?)",
+                (task_id, kind, QUEUED, json.dumps(payload), now, now),
+            )
+        self._wakeup.set()
+        return task_id
+
+    def get(self, task_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_many(self, task_ids, columns=None):
+        # task_id -> task for the ids that exist (one query, for polling a batch); columns
+        # limits what is read, e.g. ("status", "progress", "error") to skip the results
+        selected = ", ".join(["id", *columns]) if columns else "*"
+        placeholders = ", ".join("?" * len(task_ids))
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {selected} FROM tasks WHERE id IN ({placeholders})",
+                                list(task_ids)).fetchall()
+        return {row["id"]: dict(row) for row in rows}
+
+    def retry(self, task_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE tasks SET status = ?, progress = 'Waiting in queue', error = NULL, attempts = 0, "
+                         "updated_at = ? WHERE id = ? AND status = ?", (QUEUED, time.time(), task_id, FAILED))
+        self._wakeup.set()
+
+    def purge(self, older_than=None):
+        # Deletes finished (done / failed) tasks last updated more than older_than seconds ago
+        older_than = self.retention if older_than is None else older_than
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM tasks WHERE status IN (?, ?) AND updated_at < ?",
+                                   (DONE, FAILED, time.time() - older_than)).rowcount
+        self._next_purge = time.time() + self.purge_interval
+        return deleted
+
+    # --- 2. WORKERS ---
+    def _claim(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT id, kind, payload, attempts FROM tasks WHERE status = ? "
+                               "ORDER BY created_at LIMIT 1", (QUEUED,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE tasks SET status = ?, progress = 'Starting', attempts = attempts + 1, "
+                             "updated_at = ? WHERE id = ?", (RUNNING, time.time(), row["id"]))
+            conn.execute("COMMIT")
+        return row
+
+    def _update(self, task_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?", (*fields.values(), task_id))
+
+    def _work(self):
+        while True:
+            if time.time() >= self._next_purge:
+                self.purge()
+            row = self._claim()
+            if row is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            task_id = row["id"]
+
+            def report_progress(message):
+                self._update(task_id, progress=message)
+
+            try:
+                result = self.handlers[row["kind"]](json.loads(row["payload"]), report_progress)
+                self._update(task_id, status=DONE, progress="Done", result_text=result.get("text"),
+                             result_pdf=result.get("pdf"), error=None, payload="{}")
+            except Exception as exc:
+                if row["attempts"] + 1 < self.max_attempts:
+                    self._update(task_id, status=QUEUED, progress="Retrying", error=str(exc))
+                else:
+                    self._update(task_id, status=FAILED, progress="Failed", error=str(exc))
@@ -0,0 +1,73 @@
+# tests/test_ingest.py
+#
+#   python -m unittest discover tests
+
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ingest
+import job_index
+
+
+def listings(rows):
+    return pd.DataFrame(rows, columns=["Job Title", "Company Name", "Job Description"])
+
+
+class MergeJobsTest(unittest.TestCase):
+    def test_case_and_whitespace_variants_are_one_listing(self):
+        base = job_index.prepare_jobs(listings([("Data Entry", "Beta", "Typing.")]))
+        batch = listings([("Cashier", "Acme", "Register."), ("cashier ", "ACME", "Register, nights.")])
+
+        merged, changed, added, updated = ingest.merge_jobs(base, batch)
+        self.assertTrue(merged["JobId"].is_unique)
+        self.assertEqual((len(merged), added, updated), (2, 1, 0))
+        self.assertEqual(changed.tolist(), [1])
+
+        merged, changed, added, updated = ingest.merge_jobs(merged, listings([(" CASHIER", "acme ", "Updated.")]))
+        self.assertEqual((len(merged), added, updated), (2, 0, 1))
+        self.assertEqual(merged.loc[changed[0], "Job Description"], "Updated.")
+
+    def test_later_row_in_batch_wins(self):
+        base = job_index.prepare_jobs(listings([("Cashier", "Acme", "Register.")]))
+        batch = listings([("Tester", "Gamma", "old"), ("Cashier", "Acme", "Days."), ("tester", "GAMMA ", "new"),
+                          ("cashier", "acme", "Nights.")])
+
+        merged, changed, added, updated = ingest.merge_jobs(base, batch)
+        self.assertTrue(merged["JobId"].is_unique)
+        self.assertEqual((len(merged), added, updated), (2, 1, 1))
+        self.assertEqual(merged["Job Description"].tolist(), ["Nights.", "new"])
+        self.assertEqual(changed.tolist(), [0, 1])
+
+    def test_duplicate_rows_in_existing_snapshot(self):
+        # Snapshots written before JobId dedup may repeat a listing
+        rows = listings([("Cashier", "Acme", "a"), ("cashier ", "ACME", "b"), ("Tester", "Gamma", "c")])
+        legacy = pd.concat([job_index.prepare_jobs(rows.iloc[[i]]) for i in range(3)], ignore_index=True)
+
+        merged, changed, added, updated = ingest.merge_jobs(legacy, listings([("CASHIER", "Acme", "new")]))
+        self.assertTrue(merged["JobId"].is_unique)
+        self.assertEqual(merged["Job Title"].tolist(), ["CASHIER", "Tester"])
+        self.assertEqual(merged.loc[0, "Job Description"], "new")
+        self.assertEqual(changed.tolist(), [0, 1])
+
+    def test_ingest_files_with_variants(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "snapshots")
+            ingest.build_snapshot(job_index.prepare_jobs(listings([("Data Entry", "Beta", "Typing from home.")])), root)
+            batch = os.path.join(tmp, "batch.csv")
+            listings([("Cashier", "Acme", "Register."), ("cashier ", "ACME", "Register.")]).to_csv(batch, index=False)
+
+            manifest = ingest.ingest_files([batch], root)
+            jobs_df, keywords, retriever, summaries = ingest.load_snapshot(manifest["version"], root)
+            self.assertEqual((manifest["jobs"], manifest["added"]), (2, 1))
+            self.assertEqual(len(retriever.job_vectors), 2)
+            self.assertEqual(keywords.n_jobs, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
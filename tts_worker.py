@@ -0,0 +1,110 @@
+# tts_worker.py
+#
+# Background text-to-speech: one long-lived pyttsx3 engine owned by a worker thread
+# renders queued text to audio files, cached by text hash. Callers get the target
+# path back immediately and play it with st.audio once the file exists. A text that
+# failed to synthesize is not queued again for the life of the worker.
+
+import hashlib
+import os
+import queue
+import re
+import threading
+
+AUDIO_DIR = "tts_cache"
+AUDIO_SUFFIX = ".wav"
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+MARKDOWN_SYMBOLS = re.compile(r"[#*_`>|]+")
+
+
+def speech_text(markdown):
+    # Read link labels instead of URLs and drop markdown punctuation
+    text = MARKDOWN_LINK.sub(r"\1", markdown)
+    text = MARKDOWN_SYMBOLS.sub(" ", text)
+    return " ".join(text.split())
+
+
+class SpeechWorker:
+    def __init__(self, audio_dir=AUDIO_DIR, max_cache_bytes=MAX_CACHE_BYTES):
+        self.audio_dir = audio_dir
+        self.max_cache_bytes = max_cache_bytes
+        os.makedirs(audio_dir, exist_ok=True)
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+
+    def audio_path(self, text):
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return os.path.join(self.audio_dir, digest + AUDIO_SUFFIX)
+
+    def submit(self, text):
+        # Queue text for synthesis (once per distinct text) and return its audio path
+        path = self.audio_path(text)
+        with self._lock:
+            if os.path.exists(path) or path in self._pending or path in self._failed:
+                return path
+            self._pending.add(path)
+        self._queue.put((text, path))
+        return path
+
+    def is_ready(self, path):
+        return os.path.exists(path)
+
+    def error(self, path):
+        with self._lock:
+            return self._failed.get(path)
+
+    def _run(self):
+        try:
+            import pyttsx3  # loaded in the worker so page imports stay fast
+            engine = pyttsx3.init()
+            init_error = None
+        except Exception as exc:
+            engine, init_error = None, f"Text-to-speech engine unavailable: {exc}"
+
+        while True:
+            text, path = self._queue.get()
+            tmp_path = path[:-len(AUDIO_SUFFIX)] + ".part" + AUDIO_SUFFIX
+            try:
+                if engine is None:
+                    raise RuntimeError(init_error)
+                engine.save_to_file(text, tmp_path)
+                engine.runAndWait()
+                os.replace(tmp_path, path)
+                self._prune()
+            except Exception as exc:
+                with self._lock:
+                    self._failed[path] = str(exc)
+            finally:
+                with self._lock:
+                    self._pending.discard(path)
+                self._queue.task_done()
+
+    def _prune(self):
+        # Drop the oldest audio files once the cache exceeds its size budget
+        entries = [os.path.join(self.audio_dir, f) for f in os.listdir(self.audio_dir) if f.endswith(AUDIO_SUFFIX) and ".part" not in f]
+        entries.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(p) for p in entries)
+        for path in entries:
+            if total <= self.max_cache_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_speech_worker():
+    # One worker (and one engine) per process
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = SpeechWorker()
+        return _worker